@@ -1,11 +1,56 @@
 #!/usr/bin/env python3
 """Diagnostic script to check reminder service status."""
 
+import io
 import sys
 import os
-import sqlite3
 from datetime import datetime
 
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from models.database import get_sqlite_connection
+
+# Pending reminders with seconds until each fires (reminder_time is epoch).
+# Rows still holding unmigrated ISO text would give meaningless
+# countdowns; they are left out here and counted in the mismatch check.
+PENDING_SQL = """
+    SELECT r.id, s.user_id, s.name, s.title,
+           s.start_datetime, r.reminder_time, r.sent,
+           r.reminder_time - ? AS secs_until,
+           datetime(r.reminder_time, 'unixepoch', 'localtime') AS reminder_local
+    FROM reminders r
+    JOIN schedules s ON r.schedule_id = s.id
+    WHERE r.sent = 0 AND typeof(r.reminder_time) = 'integer'
+    ORDER BY r.reminder_time
+"""
+
+
+def find_bot_pids():
+    """Find PIDs of running bot processes by scanning /proc.
+
+    Returns:
+        List of PID strings whose command line runs src/main.py with python
+
+    Raises:
+        FileNotFoundError: If /proc is not available
+    """
+    own_pid = str(os.getpid())
+    pids = []
+    for pid in os.listdir('/proc'):
+        if not pid.isdigit() or pid == own_pid:
+            continue
+        try:
+            with open(f'/proc/{pid}/cmdline', 'rb') as f:
+                cmdline = f.read()
+        except OSError:
+            # Process exited or is not readable
+            continue
+        if b'python' in cmdline and b'src/main.py' in cmdline:
+            pids.append(pid)
+    return pids
+
+
 def check_reminders():
     """Check reminder status and scheduling."""
     print("=" * 60)
@@ -22,22 +67,19 @@ def check_reminders():
         print("\nPlease run 'python init_db.py' first to create the database.")
         return
 
-    conn = sqlite3.connect(db_path)
+    # Read the clock once so every section of the report uses the same "now"
+    now = datetime.now()
+
+    conn = get_sqlite_connection(db_path)
     cursor = conn.cursor()
 
     print("\n1. DATABASE STATUS:")
     print("-" * 60)
 
-    # Get pending reminders
-    cursor.execute("""
-        SELECT r.id, s.user_id, s.name, s.title,
-               s.start_datetime, r.reminder_time, r.sent,
-               datetime('now', 'localtime') as current_local
-        FROM reminders r
-        JOIN schedules s ON r.schedule_id = s.id
-        WHERE r.sent = FALSE
-        ORDER BY r.reminder_time
-    """)
+    # Get pending reminders. reminder_time is stored as Unix epoch seconds,
+    # so the time until each fires is a plain integer subtraction.
+    now_epoch = int(now.timestamp())
+    cursor.execute(PENDING_SQL, (now_epoch,))
 
     pending = cursor.fetchall()
 
@@ -46,52 +88,57 @@ def check_reminders():
     else:
         print(f"✅ Found {len(pending)} pending reminder(s):\n")
 
-        current_time = datetime.now()
+        # Build the whole report in memory and write it once
+        buf = io.StringIO()
         for row in pending:
-            rid, user_id, name, title, start, reminder_time, sent, current_local = row
-            reminder_dt = datetime.fromisoformat(reminder_time)
-            time_diff = (reminder_dt - current_time).total_seconds()
-            hours = int(time_diff // 3600)
-            minutes = int((time_diff % 3600) // 60)
-
-            print(f"  Reminder ID: {rid}")
-            print(f"  Schedule: {name} - {title}")
-            print(f"  User ID: {user_id}")
-            print(f"  Start time: {start}")
-            print(f"  Reminder time: {reminder_time}")
+            rid, user_id, name, title, start, reminder_time, sent, time_diff, reminder_local = row
+            hours, rem = divmod(abs(time_diff), 3600)
+            minutes, _ = divmod(rem, 60)
+
+            buf.write(
+                f"  Reminder ID: {rid}\n"
+                f"  Schedule: {name} - {title}\n"
+                f"  User ID: {user_id}\n"
+                f"  Start time: {start}\n"
+                f"  Reminder time: {reminder_local}\n"
+            )
 
             if time_diff > 0:
-                print(f"  ✅ Will fire in: {hours}h {minutes}m")
+                buf.write(f"  ✅ Will fire in: {hours}h {minutes}m\n")
             else:
-                print(f"  ❌ PAST DUE by: {-hours}h {-minutes}m")
-            print()
+                buf.write(f"  ❌ PAST DUE by: {hours}h {minutes}m\n")
+            buf.write("\n")
+        sys.stdout.write(buf.getvalue())
+
+    # Read clock values and the legacy-row count in a single round-trip.
+    # Epoch timestamps are timezone independent, so the only way to get
+    # a mismatch is a pending reminder still stored as local-time text.
+    cursor.execute("""
+        SELECT datetime('now') AS utc,
+               datetime('now', 'localtime') AS local,
+               (SELECT COUNT(*)
+                FROM reminders r
+                WHERE r.sent = 0
+                  AND typeof(r.reminder_time) != 'integer') AS mismatch_count
+    """)
+    utc, local, mismatch_count = cursor.fetchone()
 
     # Check timezone info
     print("\n2. TIMEZONE INFORMATION:")
     print("-" * 60)
-    cursor.execute("SELECT datetime('now') as utc, datetime('now', 'localtime') as local")
-    utc, local = cursor.fetchone()
     print(f"SQLite UTC time:   {utc}")
     print(f"SQLite local time: {local}")
-    print(f"Python local time: {datetime.now()}")
+    print(f"Python local time: {now}")
 
     # Check for timezone mismatch
     print("\n3. TIMEZONE ISSUE CHECK:")
     print("-" * 60)
-    cursor.execute("""
-        SELECT COUNT(*)
-        FROM reminders r
-        WHERE r.sent = FALSE
-          AND r.reminder_time > datetime('now')
-          AND r.reminder_time <= datetime('now', 'localtime')
-    """)
-    mismatch_count = cursor.fetchone()[0]
 
     if mismatch_count > 0:
         print(f"⚠️  WARNING: {mismatch_count} reminder(s) affected by timezone mismatch!")
-        print("   The code uses datetime('now') which is UTC.")
-        print("   But datetimes are stored in local timezone.")
-        print("   This causes incorrect comparisons.")
+        print("   Their reminder_time is still stored as local-time text.")
+        print("   Reminder times are now stored as UTC epoch seconds.")
+        print("   Run 'python init_db.py' or restart the bot to migrate them.")
     else:
         print("✅ No timezone mismatch detected")
 
@@ -100,24 +147,23 @@ def check_reminders():
     # Check bot process
     print("\n4. BOT PROCESS STATUS:")
     print("-" * 60)
-    import subprocess
     try:
-        result = subprocess.run(['pgrep', '-f', 'python.*src/main.py'],
-                              capture_output=True, text=True)
-        if result.stdout:
-            print(f"✅ Bot is running (PID: {result.stdout.strip()})")
+        pids = find_bot_pids()
+        if pids:
+            print(f"✅ Bot is running (PID: {', '.join(pids)})")
         else:
             print("❌ Bot is NOT running!")
     except FileNotFoundError:
-        print("⚠️  Cannot check bot status (pgrep not available)")
-        print("   This is normal in Docker containers or minimal environments")
+        print("⚠️  Cannot check bot status (/proc not available)")
+        print("   This is normal on non-Linux systems")
 
     print("\n" + "=" * 60)
     print("RECOMMENDATIONS:")
     print("=" * 60)
 
     if pending:
-        has_future = any(datetime.fromisoformat(row[5]) > datetime.now() for row in pending)
+        # Reuse the secs_until column instead of re-deriving each reminder time
+        has_future = any(row[7] > 0 for row in pending)
         if has_future:
             print("✅ Reminder service appears to be working correctly")
             print("   Future reminders are scheduled and should fire on time")
@@ -129,6 +175,7 @@ def check_reminders():
 
     print("\n")
 
+
 if __name__ == '__main__':
     try:
         check_reminders()
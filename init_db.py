@@ -31,13 +31,20 @@ def init_database():
     with db.get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")
-        tables = cursor.fetchall()
+        tables = [row[0] for row in cursor.fetchall()]
+
+        # Count rows of every table in a single query
+        counts_sql = " UNION ALL ".join(
+            f"SELECT '{table}' AS name, COUNT(*) AS count FROM \"{table}\""
+            for table in tables
+        )
+        cursor.execute(counts_sql)
 
         print("\nVerified tables in database:")
-        for table in tables:
-            cursor.execute(f"SELECT COUNT(*) FROM {table[0]}")
-            count = cursor.fetchone()[0]
-            print(f"  ✓ {table[0]} (0 rows)")
+        for name, count in cursor.fetchall():
+            print(f"  ✓ {name} ({count} rows)")
+
+    db.close()
 
     print(f"\nDatabase file created at: {os.path.abspath(db_path)}")
 
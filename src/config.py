@@ -1,34 +1,59 @@
 """Configuration management."""
 
 import os
+import sys
+from dataclasses import dataclass
+from typing import Optional
+
 from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
+# Load environment variables from .env file, unless the environment is
+# already populated (e.g. Docker), which skips reading and parsing the file
+if os.getenv('TELEGRAM_BOT_TOKEN') is None:
+    load_dotenv(override=False)
+
+# Slotted dataclasses need Python 3.10+; fall back to a plain frozen one
+_DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
 
 
-class Config:
-    """Application configuration."""
+@dataclass(frozen=True, **_DATACLASS_OPTIONS)
+class _Config:
+    """Application configuration, read once from the environment."""
 
     # Telegram Bot Token
-    TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
+    TELEGRAM_BOT_TOKEN: Optional[str]
 
     # Database
-    DATABASE_PATH = os.getenv('DATABASE_PATH', 'telegram_note.db')
+    DATABASE_PATH: str
 
     # Web App
-    WEBAPP_BASE_URL = os.getenv('WEBAPP_BASE_URL', 'http://localhost:8000')
-    WEBAPP_PORT = int(os.getenv('WEBAPP_PORT', '8000'))
+    WEBAPP_BASE_URL: str
+    WEBAPP_PORT: int
+
+    # Debugging: log every incoming update
+    DEBUG: bool
 
-    @classmethod
-    def validate(cls):
+    # Render markdown with the C-based cmarkgfm parser (if installed)
+    USE_CMARK: bool
+
+    def validate(self):
         """Validate required configuration.
 
         Raises:
             ValueError: If required configuration is missing
         """
-        if not cls.TELEGRAM_BOT_TOKEN:
+        if not self.TELEGRAM_BOT_TOKEN:
             raise ValueError(
                 "TELEGRAM_BOT_TOKEN is required. "
                 "Please set it in .env file or environment variable."
             )
+
+
+Config = _Config(
+    TELEGRAM_BOT_TOKEN=os.getenv('TELEGRAM_BOT_TOKEN'),
+    DATABASE_PATH=os.getenv('DATABASE_PATH', 'telegram_note.db'),
+    WEBAPP_BASE_URL=os.getenv('WEBAPP_BASE_URL', 'http://localhost:8000'),
+    WEBAPP_PORT=int(os.getenv('WEBAPP_PORT', '8000')),
+    DEBUG=os.getenv('DEBUG', '').lower() in ('1', 'true', 'yes'),
+    USE_CMARK=os.getenv('USE_CMARK', '').lower() in ('1', 'true', 'yes'),
+)
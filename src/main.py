@@ -1,31 +1,43 @@
 """Main entry point for Telegram Note bot."""
 
+import asyncio
+import functools
+import hashlib
 import logging
-import json
-import markdown
-from urllib.parse import urlencode
-from telegram import Update, BotCommand, WebAppInfo, InlineKeyboardButton, InlineKeyboardMarkup, KeyboardButton, ReplyKeyboardMarkup, ReplyKeyboardRemove
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Tuple
+from urllib.parse import quote, urlencode
+
+import orjson
+try:
+    import uvloop
+except ImportError:  # optional; not available on Windows
+    uvloop = None
+from telegram import Update, BotCommand, WebAppInfo, KeyboardButton, ReplyKeyboardMarkup
 from telegram.ext import (
     Application,
     CommandHandler,
     MessageHandler,
-    ConversationHandler,
     CallbackQueryHandler,
     filters,
     ContextTypes
 )
 
 from config import Config
-from models import Database
+from models import Database, Note, Schedule
 from modules.note_module import NoteModule
 from modules.schedule_module import ScheduleModule
 from services.reminder_service import ReminderService
 from webapp_server import WebAppServer
 from version import __version__
+from utils.datetime_utils import format_datetime, format_time
+from utils.markdown_utils import escape_html, render_markdown_preview
 from utils.pagination import (
     PaginationHelper,
-    format_note_for_list,
-    format_schedule_for_list,
     format_note_button,
     format_schedule_button
 )
@@ -41,6 +53,50 @@ logger = logging.getLogger(__name__)
 EDITING_NOTE = 1
 EDITING_SCHEDULE = 2
 
+# Splits a comma-separated tag string, absorbing whitespace around commas
+TAG_SPLIT_RE = re.compile(r'\s*,\s*')
+
+# Every callback data shape the bot produces; the part before the first
+# ':' selects the handler in TelegramNoteBot._callback_map
+CALLBACK_DATA_RE = re.compile(
+    r'^(?:notes_page:\d+|schedules_page:\d+|view_note:.*|view_schedule:.*|noop)$',
+    re.DOTALL
+)
+
+# Static message fragments
+NOTE_SAVED_HEADER = "✅ <b>Note saved successfully!</b>\n"
+SCHEDULE_SAVED_HEADER = "✅ <b>Schedule saved successfully!</b>\n"
+NOTE_EDIT_HINT = "\n<i>Tap the button below to edit this note in a rich editor</i>"
+SCHEDULE_EDIT_HINT = "\n<i>Tap the button below to edit this schedule in a rich editor</i>"
+NOTES_HEADER_TMPL = "📝 Your Notes{filter}\nShowing {n} note(s)\n\nTap a note to view or edit it:"
+SCHEDULES_HEADER_TMPL = "📅 Your Schedules{filter}\nShowing {n} schedule(s)\n\nTap a schedule to view or edit it:"
+# Commands registered with Telegram for auto-completion
+BOT_COMMANDS = (
+    ("start", "Start the bot and show help"),
+    ("help", "Show available commands"),
+    ("notes", "List all notes (optionally filter by keyword/tag)"),
+    ("note", "Open or create a note"),
+    ("schedules", "List all schedules (optionally filter by period)"),
+    ("schedule", "Open or create a schedule"),
+    ("delete", "Delete a note or schedule by name"),
+    ("version", "Show bot version information"),
+)
+
+# Small JSON file kept next to the database for state that should survive
+# restarts (e.g. the hash of the last registered command list)
+BOT_STATE_FILENAME = ".bot_state.json"
+
+HELP_TEXT = (
+    "Welcome to Telegram Note! 📝\n\n"
+    "Available commands:\n"
+    "/notes [keyword/tag] - List notes\n"
+    "/note <name> - Open or create a note\n"
+    "/schedules [period] - List schedules\n"
+    "/schedule <name> - Open or create a schedule\n"
+    "/delete <name> - Delete a note or schedule\n"
+    "/help - Show this help message"
+)
+
 
 class TelegramNoteBot:
     """Main bot class."""
@@ -50,65 +106,271 @@ class TelegramNoteBot:
         Config.validate()
         self.db = Database(Config.DATABASE_PATH)
         self.note_module = NoteModule(self.db)
-        self.schedule_module = ScheduleModule(self.db)
         self.reminder_service = ReminderService(self.db)
+        self.schedule_module = ScheduleModule(self.db, self.reminder_service)
         self.webapp_server = WebAppServer(port=Config.WEBAPP_PORT)
 
+        # Editor URLs only depend on config, so build them once
+        self._note_editor_url = self.webapp_server.get_url('note_editor.html', base_url=Config.WEBAPP_BASE_URL)
+        self._schedule_editor_url = self.webapp_server.get_url('schedule_editor.html', base_url=Config.WEBAPP_BASE_URL)
+
+        self._bot_state_path = os.path.join(
+            os.path.dirname(os.path.abspath(Config.DATABASE_PATH)), BOT_STATE_FILENAME
+        )
+
+        # Command and callback-prefix dispatch tables, each served by a
+        # single registered handler
+        self._command_map = {
+            "start": self.start,
+            "help": self.help_command,
+            "version": self.version_command,
+            "notes": self.notes_command,
+            "note": self.note_command,
+            "schedules": self.schedules_command,
+            "schedule": self.schedule_command,
+            "delete": self.delete_command,
+        }
+        self._callback_map = {
+            "notes_page": self.handle_notes_page_callback,
+            "schedules_page": self.handle_schedules_page_callback,
+            "view_note": self.handle_view_note_callback,
+            "view_schedule": self.handle_view_schedule_callback,
+            "noop": self.handle_noop_callback,
+        }
+
+        # Markdown parsing is CPU-bound pure Python; worker processes keep it
+        # off the event loop without contending for this process's GIL.
+        # Workers are spawned, not forked: this process already holds
+        # SQLite connections and scheduler/server threads that a fork
+        # would copy mid-state. The preview LRU cache in markdown_utils
+        # lives in each worker and starts cold whenever the pool does.
+        self._md_pool = self._new_md_pool()
+
     @staticmethod
     def _escape_html(text: str) -> str:
         """Escape HTML special characters."""
-        return (text
-                .replace('&', '&amp;')
-                .replace('<', '&lt;')
-                .replace('>', '&gt;'))
+        return escape_html(text)
 
-    def _render_markdown_preview(self, content: str, max_length: int = 300) -> str:
-        """Render markdown content as HTML preview for Telegram."""
-        content_preview = content[:max_length] + '...' if len(content) > max_length else content
+    @staticmethod
+    def _new_md_pool() -> ProcessPoolExecutor:
+        """Create the markdown render pool."""
+        return ProcessPoolExecutor(
+            max_workers=2, mp_context=multiprocessing.get_context('spawn')
+        )
 
-        if not content_preview.strip():
-            return ""
+    async def _render_markdown_preview(self, content: str, max_length: int = 300) -> str:
+        """Render markdown content as HTML preview for Telegram in the render pool.
 
+        Falls back to the escaped plain text if the pool fails, and
+        replaces a broken pool so later previews render again.
+        """
+        pool = self._md_pool
         try:
-            html_preview = markdown.markdown(content_preview)
-            # Clean up HTML tags that Telegram doesn't support well
-            html_preview = html_preview.replace('<p>', '').replace('</p>', '\n')
-            html_preview = html_preview.replace('<h1>', '\n<b>').replace('</h1>', '</b>')
-            html_preview = html_preview.replace('<h2>', '\n<b>').replace('</h2>', '</b>')
-            html_preview = html_preview.replace('<h3>', '\n<b>').replace('</h3>', '</b>')
-            html_preview = html_preview.replace('<em>', '<i>').replace('</em>', '</i>')
-            return html_preview.strip()
+            return await asyncio.get_running_loop().run_in_executor(
+                pool, render_markdown_preview, content, max_length
+            )
         except Exception as e:
-            logger.warning(f"Failed to render markdown preview: {e}")
-            return self._escape_html(content_preview)
+            logger.error(f"Markdown render pool failed: {e}")
+            # A dead worker breaks the whole pool; swap in a fresh one
+            # unless a concurrent failure already did
+            if isinstance(e, BrokenProcessPool) and self._md_pool is pool:
+                self._md_pool = self._new_md_pool()
+                pool.shutdown(wait=False, cancel_futures=True)
+            content_preview = content[:max_length] + '...' if len(content) > max_length else content
+            return escape_html(content_preview)
+
+    def _notes_paginator(self, user_id: int, note_ids: List[int]) -> PaginationHelper:
+        """Build a paginator that loads one page of notes at a time."""
+        return PaginationHelper(
+            note_ids,
+            functools.partial(self.note_module.get_notes_by_ids, user_id),
+            items_per_page=10,
+            callback_prefix="notes_page"
+        )
 
-    async def setup_commands(self, application: Application):
-        """Set up bot commands for auto-completion."""
-        commands = [
-            BotCommand("start", "Start the bot and show help"),
-            BotCommand("help", "Show available commands"),
-            BotCommand("notes", "List all notes (optionally filter by keyword/tag)"),
-            BotCommand("note", "Open or create a note"),
-            BotCommand("schedules", "List all schedules (optionally filter by period)"),
-            BotCommand("schedule", "Open or create a schedule"),
-            BotCommand("delete", "Delete a note or schedule by name"),
-            BotCommand("version", "Show bot version information"),
+    @staticmethod
+    def _refresh_list_pages(context: ContextTypes.DEFAULT_TYPE):
+        """Drop cached list pages after the user saved or deleted an item."""
+        for key in ('notes_paginator', 'schedules_paginator'):
+            paginator = context.user_data.get(key)
+            if paginator is not None:
+                paginator.clear_cache()
+
+    def _schedules_paginator(self, user_id: int, schedule_ids: List[int]) -> PaginationHelper:
+        """Build a paginator that loads one page of schedules at a time."""
+        return PaginationHelper(
+            schedule_ids,
+            functools.partial(self.schedule_module.get_schedules_by_ids, user_id),
+            items_per_page=10,
+            callback_prefix="schedules_page"
+        )
+
+    @staticmethod
+    def _editor_keyboard(button_text: str, webapp_url: str) -> ReplyKeyboardMarkup:
+        """Build the one-button reply keyboard that opens a Web App editor."""
+        # Note: Reply keyboards (not inline) are required for web_app.sendData() to work
+        keyboard = [[KeyboardButton(
+            text=button_text,
+            web_app=WebAppInfo(url=webapp_url)
+        )]]
+        return ReplyKeyboardMarkup(
+            keyboard,
+            one_time_keyboard=True,
+            resize_keyboard=True
+        )
+
+    async def _render_note_view(
+        self, note_name: str, note: Optional[Note]
+    ) -> Tuple[str, ReplyKeyboardMarkup, Optional[str]]:
+        """Build the message and editor keyboard for viewing a note.
+
+        Args:
+            note_name: Requested note name
+            note: Existing note, or None to offer creating it
+
+        Returns:
+            Tuple of (message, reply_markup, parse_mode)
+        """
+        # Build URL with note data
+        params = {'name': note_name}
+        if note:
+            params['title'] = note.title
+            params['tags'] = ','.join(note.tags) if note.tags else ''
+            params['content'] = note.content
+
+        # Add security token
+        params['_token'] = self.webapp_server.generate_token()
+
+        webapp_url = f"{self._note_editor_url}?{urlencode(params, quote_via=quote)}"
+        reply_markup = self._editor_keyboard("📝 Edit Note", webapp_url)
+
+        if not note:
+            message = (
+                f"📝 Creating new note: {note_name}\n\n"
+                f"Tap the button below to open the editor"
+            )
+            return message, reply_markup, None
+
+        # Build message with HTML formatting
+        message_parts = [
+            f"📝 <b>Note: {self._escape_html(note.name)}</b>\n",
+            f"<b>{self._escape_html(note.title)}</b>",
+            f"🏷 Tags: {', '.join(self._escape_html(t) for t in note.tags)}" if note.tags else "🏷 Tags: None",
+        ]
+
+        # Add markdown preview
+        html_preview = await self._render_markdown_preview(note.content)
+        if html_preview:
+            message_parts.append(f"\n{html_preview}")
+
+        message_parts.append(NOTE_EDIT_HINT)
+        return '\n'.join(message_parts), reply_markup, 'HTML'
+
+    async def _render_schedule_view(
+        self, schedule_name: str, schedule: Optional[Schedule]
+    ) -> Tuple[str, ReplyKeyboardMarkup, Optional[str]]:
+        """Build the message and editor keyboard for viewing a schedule.
+
+        Args:
+            schedule_name: Requested schedule name
+            schedule: Existing schedule, or None to offer creating it
+
+        Returns:
+            Tuple of (message, reply_markup, parse_mode)
+        """
+        # Build URL with schedule data
+        params = {'name': schedule_name}
+        if schedule:
+            params['title'] = schedule.title
+            params['start_datetime'] = schedule.start_datetime.isoformat()
+            params['end_datetime'] = schedule.end_datetime.isoformat()
+            params['reminder_minutes'] = str(schedule.reminder_minutes) if schedule.reminder_minutes else '0'
+            params['description'] = schedule.description
+
+        # Add security token
+        params['_token'] = self.webapp_server.generate_token()
+
+        webapp_url = f"{self._schedule_editor_url}?{urlencode(params, quote_via=quote)}"
+        reply_markup = self._editor_keyboard("📅 Edit Schedule", webapp_url)
+
+        if not schedule:
+            message = (
+                f"📅 Creating new schedule: {schedule_name}\n\n"
+                f"Tap the button below to open the editor"
+            )
+            return message, reply_markup, None
+
+        # Build message with HTML formatting
+        message_parts = [
+            f"📅 <b>Schedule: {self._escape_html(schedule.name)}</b>\n",
+            f"<b>{self._escape_html(schedule.title)}</b>",
+            f"🕐 {format_datetime(schedule.start_datetime)} - {format_time(schedule.end_datetime)}",
         ]
+        if schedule.reminder_minutes:
+            message_parts.append(f"⏰ Reminder: {schedule.reminder_minutes} min before")
+
+        # Add markdown preview for description
+        if schedule.description:
+            html_preview = await self._render_markdown_preview(schedule.description)
+            if html_preview:
+                message_parts.append(f"\n{html_preview}")
+
+        message_parts.append(SCHEDULE_EDIT_HINT)
+        return '\n'.join(message_parts), reply_markup, 'HTML'
+
+    def _load_bot_state(self) -> dict:
+        """Load persisted bot state, or an empty dict if there is none."""
+        try:
+            with open(self._bot_state_path, 'rb') as f:
+                return orjson.loads(f.read())
+        except FileNotFoundError:
+            return {}
+        except (OSError, orjson.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable bot state file: {e}")
+            return {}
+
+    def _save_bot_state(self, state: dict):
+        """Persist bot state next to the database."""
+        try:
+            with open(self._bot_state_path, 'wb') as f:
+                f.write(orjson.dumps(state))
+        except OSError as e:
+            logger.warning(f"Could not save bot state: {e}")
+
+    async def setup_commands(self, application: Application):
+        """Set up bot commands for auto-completion.
+
+        The command list only changes between releases, so the API call is
+        skipped when the same list was already registered for this bot.
+        """
+        commands_hash = hashlib.blake2b(
+            repr((application.bot.id, BOT_COMMANDS)).encode(), digest_size=16
+        ).hexdigest()
+        state = self._load_bot_state()
+        if state.get('commands_hash') == commands_hash:
+            logger.info("Bot commands unchanged, skipping registration")
+            return
+
+        commands = [BotCommand(command, description) for command, description in BOT_COMMANDS]
         await application.bot.set_my_commands(commands)
+        state['commands_hash'] = commands_hash
+        self._save_bot_state(state)
         logger.info("Bot commands registered for auto-completion")
 
+    async def _dispatch_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Route a bot command to its handler via the command table."""
+        # "/notes@my_bot work" -> "notes"; commands are case-insensitive
+        command = update.effective_message.text.split(maxsplit=1)[0][1:].split('@', 1)[0].lower()
+        return await self._command_map[command](update, context)
+
+    async def _dispatch_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Route a callback query to its handler by callback data prefix."""
+        prefix = update.callback_query.data.split(':', 1)[0]
+        return await self._callback_map[prefix](update, context)
+
     async def start(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /start command."""
-        await update.message.reply_text(
-            "Welcome to Telegram Note! 📝\n\n"
-            "Available commands:\n"
-            "/notes [keyword/tag] - List notes\n"
-            "/note <name> - Open or create a note\n"
-            "/schedules [period] - List schedules\n"
-            "/schedule <name> - Open or create a schedule\n"
-            "/delete <name> - Delete a note or schedule\n"
-            "/help - Show this help message"
-        )
+        await update.message.reply_text(HELP_TEXT)
 
     async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /help command."""
@@ -128,19 +390,17 @@ class TelegramNoteBot:
         user_id = update.effective_user.id
         keyword = ' '.join(context.args) if context.args else None
 
-        notes = self.note_module.list_notes(user_id, keyword)
+        # Only the ordered IDs are kept; each page is fetched on demand
+        note_ids = self.note_module.list_note_ids(user_id, keyword)
 
-        if not notes:
+        if not note_ids:
             await update.message.reply_text("No notes found.")
             return
 
-        # Sort by updated_at descending (most recent first)
-        notes.sort(key=lambda n: n.updated_at if n.updated_at else "", reverse=True)
+        paginator = self._notes_paginator(user_id, note_ids)
 
-        # Create pagination helper
-        paginator = PaginationHelper(notes, items_per_page=10, callback_prefix="notes_page")
-
-        # Store paginator in context for callback handlers
+        # Keep the paginator for callback handlers so pages already built
+        # are served from its keyboard cache
         context.user_data['notes_paginator'] = paginator
         context.user_data['notes_keyword'] = keyword
 
@@ -153,9 +413,7 @@ class TelegramNoteBot:
 
         # Build header message
         filter_msg = f" (filtered by: {keyword})" if keyword else ""
-        header = f"📝 Your Notes{filter_msg}\n"
-        header += f"Showing {len(notes)} note(s)\n\n"
-        header += "Tap a note to view or edit it:"
+        header = NOTES_HEADER_TMPL.format(filter=filter_msg, n=len(note_ids))
 
         await update.message.reply_text(
             header,
@@ -172,53 +430,7 @@ class TelegramNoteBot:
         note_name = context.args[0]
 
         note = self.note_module.get_note(user_id, note_name)
-
-        # Build URL with note data
-        params = {'name': note_name}
-        if note:
-            params['title'] = note.title
-            params['tags'] = ','.join(note.tags) if note.tags else ''
-            params['content'] = note.content
-
-        # Add security token
-        params['_token'] = self.webapp_server.generate_token()
-
-        webapp_url = f"{self.webapp_server.get_url('note_editor.html', base_url=Config.WEBAPP_BASE_URL)}?{urlencode(params)}"
-
-        # Create reply keyboard with Web App button
-        # Note: Reply keyboards (not inline) are required for web_app.sendData() to work
-        keyboard = [[KeyboardButton(
-            text="📝 Edit Note",
-            web_app=WebAppInfo(url=webapp_url)
-        )]]
-        reply_markup = ReplyKeyboardMarkup(
-            keyboard,
-            one_time_keyboard=True,
-            resize_keyboard=True
-        )
-
-        if note:
-            # Build message with HTML formatting
-            message_parts = [
-                f"📝 <b>Note: {self._escape_html(note.name)}</b>\n",
-                f"<b>{self._escape_html(note.title)}</b>",
-                f"🏷 Tags: {', '.join(self._escape_html(t) for t in note.tags)}" if note.tags else "🏷 Tags: None",
-            ]
-
-            # Add markdown preview
-            html_preview = self._render_markdown_preview(note.content)
-            if html_preview:
-                message_parts.append(f"\n{html_preview}")
-
-            message_parts.append("\n<i>Tap the button below to edit this note in a rich editor</i>")
-            message = '\n'.join(message_parts)
-            parse_mode = 'HTML'
-        else:
-            message = (
-                f"📝 Creating new note: {note_name}\n\n"
-                f"Tap the button below to open the editor"
-            )
-            parse_mode = None
+        message, reply_markup, parse_mode = await self._render_note_view(note_name, note)
 
         await update.message.reply_text(
             message,
@@ -231,19 +443,17 @@ class TelegramNoteBot:
         user_id = update.effective_user.id
         period = ' '.join(context.args) if context.args else None
 
-        schedules = self.schedule_module.list_schedules(user_id, period)
+        # Only the ordered IDs are kept; each page is fetched on demand
+        schedule_ids = self.schedule_module.list_schedule_ids(user_id, period)
 
-        if not schedules:
+        if not schedule_ids:
             await update.message.reply_text("No schedules found.")
             return
 
-        # Sort by updated_at descending (most recent first)
-        schedules.sort(key=lambda s: s.updated_at if s.updated_at else "", reverse=True)
+        paginator = self._schedules_paginator(user_id, schedule_ids)
 
-        # Create pagination helper
-        paginator = PaginationHelper(schedules, items_per_page=10, callback_prefix="schedules_page")
-
-        # Store paginator in context for callback handlers
+        # Keep the paginator for callback handlers so pages already built
+        # are served from its keyboard cache
         context.user_data['schedules_paginator'] = paginator
         context.user_data['schedules_period'] = period
 
@@ -256,9 +466,7 @@ class TelegramNoteBot:
 
         # Build header message
         filter_msg = f" (period: {period})" if period else ""
-        header = f"📅 Your Schedules{filter_msg}\n"
-        header += f"Showing {len(schedules)} schedule(s)\n\n"
-        header += "Tap a schedule to view or edit it:"
+        header = SCHEDULES_HEADER_TMPL.format(filter=filter_msg, n=len(schedule_ids))
 
         await update.message.reply_text(
             header,
@@ -275,56 +483,7 @@ class TelegramNoteBot:
         schedule_name = context.args[0]
 
         schedule = self.schedule_module.get_schedule(user_id, schedule_name)
-
-        # Build URL with schedule data
-        params = {'name': schedule_name}
-        if schedule:
-            params['title'] = schedule.title
-            params['start_datetime'] = schedule.start_datetime.isoformat()
-            params['end_datetime'] = schedule.end_datetime.isoformat()
-            params['reminder_minutes'] = str(schedule.reminder_minutes) if schedule.reminder_minutes else '0'
-            params['description'] = schedule.description
-
-        # Add security token
-        params['_token'] = self.webapp_server.generate_token()
-
-        webapp_url = f"{self.webapp_server.get_url('schedule_editor.html', base_url=Config.WEBAPP_BASE_URL)}?{urlencode(params)}"
-
-        # Create reply keyboard with Web App button
-        keyboard = [[KeyboardButton(
-            text="📅 Edit Schedule",
-            web_app=WebAppInfo(url=webapp_url)
-        )]]
-        reply_markup = ReplyKeyboardMarkup(
-            keyboard,
-            one_time_keyboard=True,
-            resize_keyboard=True
-        )
-
-        if schedule:
-            # Build message with HTML formatting
-            message_parts = [
-                f"📅 <b>Schedule: {self._escape_html(schedule.name)}</b>\n",
-                f"<b>{self._escape_html(schedule.title)}</b>",
-                f"🕐 {schedule.start_datetime.strftime('%Y-%m-%d %H:%M')} - {schedule.end_datetime.strftime('%H:%M')}",
-                f"⏰ Reminder: {schedule.reminder_minutes} min before" if schedule.reminder_minutes else "",
-            ]
-
-            # Add markdown preview for description
-            if schedule.description:
-                html_preview = self._render_markdown_preview(schedule.description)
-                if html_preview:
-                    message_parts.append(f"\n{html_preview}")
-
-            message_parts.append("\n<i>Tap the button below to edit this schedule in a rich editor</i>")
-            message = '\n'.join(filter(None, message_parts))
-            parse_mode = 'HTML'
-        else:
-            message = (
-                f"📅 Creating new schedule: {schedule_name}\n\n"
-                f"Tap the button below to open the editor"
-            )
-            parse_mode = None
+        message, reply_markup, parse_mode = await self._render_schedule_view(schedule_name, schedule)
 
         await update.message.reply_text(
             message,
@@ -344,11 +503,13 @@ class TelegramNoteBot:
         user_id = update.effective_user.id
         name = context.args[0]
 
-        # Try to find as a note first
-        note = self.note_module.get_note(user_id, name)
-        if note:
+        # Look the name up in notes and schedules at once
+        found = self.db.find_by_name(user_id, name)
+
+        if found and found[0] == 'note':
             # Delete the note
             if self.note_module.delete_note(user_id, name):
+                self._refresh_list_pages(context)
                 await update.message.reply_text(
                     f"✅ Note '{name}' has been deleted successfully."
                 )
@@ -358,16 +519,11 @@ class TelegramNoteBot:
                 )
             return
 
-        # Try to find as a schedule
-        schedule = self.schedule_module.get_schedule(user_id, name)
-        if schedule:
-            # Cancel reminder if it exists
-            if schedule.reminder_minutes and schedule.id:
-                self.reminder_service.cancel_reminder(schedule.id)
-                logger.info(f"Cancelled reminder for schedule '{name}' (ID: {schedule.id})")
-
-            # Delete the schedule
+        if found:
+            schedule = found[1]
+            # Delete the schedule; its pending reminder is cancelled with it
             if self.schedule_module.delete_schedule(user_id, name):
+                self._refresh_list_pages(context)
                 await update.message.reply_text(
                     f"✅ Schedule '{name}' has been deleted successfully.\n"
                     f"{'🔕 Associated reminder has been cancelled.' if schedule.reminder_minutes else ''}"
@@ -390,7 +546,7 @@ class TelegramNoteBot:
 
         try:
             # Parse the JSON data from the Web App
-            data = json.loads(update.effective_message.web_app_data.data)
+            data = orjson.loads(update.effective_message.web_app_data.data)
 
             # Determine if this is a note or schedule based on fields
             if 'start_datetime' in data:
@@ -400,13 +556,16 @@ class TelegramNoteBot:
                 # This is a note
                 await self._handle_note_web_app_data(update, user_id, data)
 
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to parse Web App data: {e}")
             logger.error(f"Raw data: {update.effective_message.web_app_data.data}")
             await update.effective_message.reply_text("❌ Error: Invalid data received from editor")
         except Exception as e:
             logger.error(f"Error handling Web App data: {e}", exc_info=True)
             await update.effective_message.reply_text(f"❌ Error saving: {str(e)}")
+        finally:
+            # The item may have been saved even if replying failed
+            self._refresh_list_pages(context)
 
     async def _handle_note_web_app_data(self, update: Update, user_id: int, data: dict):
         """Handle note data from Web App."""
@@ -419,7 +578,7 @@ class TelegramNoteBot:
         logger.debug(f"Data: title={title}, tags={tags_str}, content_len={len(content)}")
 
         # Parse tags
-        tags = [t.strip() for t in tags_str.split(',') if t.strip()]
+        tags = [t for t in TAG_SPLIT_RE.split(tags_str.strip()) if t]
 
         # Save the note
         self.note_module.save_note(
@@ -432,13 +591,13 @@ class TelegramNoteBot:
 
         # Build success message with HTML formatting
         message_parts = [
-            "✅ <b>Note saved successfully!</b>\n",
+            NOTE_SAVED_HEADER,
             f"📝 <b>{self._escape_html(title)}</b>",
             f"🏷 Tags: {', '.join(self._escape_html(t) for t in tags)}" if tags else "🏷 Tags: None",
         ]
 
         # Add markdown preview
-        html_preview = self._render_markdown_preview(content, max_length=200)
+        html_preview = await self._render_markdown_preview(content, max_length=200)
         if html_preview:
             message_parts.append(f"\n{html_preview}")
 
@@ -451,22 +610,23 @@ class TelegramNoteBot:
 
     async def _handle_schedule_web_app_data(self, update: Update, user_id: int, data: dict):
         """Handle schedule data from Web App."""
-        from datetime import datetime
-
         schedule_name = data.get('name')
         title = data.get('title')
         start_datetime_str = data.get('start_datetime')
         end_datetime_str = data.get('end_datetime')
-        reminder_minutes_str = data.get('reminder_minutes', '0')
+        reminder_minutes_str = str(data.get('reminder_minutes', '0'))
         description = data.get('description', '')
 
         logger.info(f"Received Web App data for schedule '{schedule_name}' from user {user_id}")
 
-        # Parse reminder minutes
-        reminder_minutes = int(reminder_minutes_str) if reminder_minutes_str else 0
+        # Parse reminder minutes; anything but a plain non-negative integer
+        # means no reminder (isdecimal, unlike isdigit, never lets int() raise)
+        reminder_minutes = int(reminder_minutes_str) if reminder_minutes_str.isdecimal() else 0
 
-        # Save the schedule (save_schedule expects datetime strings, not objects)
-        self.schedule_module.save_schedule(
+        # Save the schedule (save_schedule expects datetime strings, not objects).
+        # The returned Schedule already carries parsed datetimes, so the
+        # success message and reminder reuse it instead of re-parsing.
+        schedule = self.schedule_module.save_schedule(
             user_id=user_id,
             name=schedule_name,
             title=title,
@@ -475,36 +635,39 @@ class TelegramNoteBot:
             reminder_minutes=reminder_minutes,
             description=description
         )
-
-        # Parse datetime for display in success message
-        start_datetime = datetime.fromisoformat(start_datetime_str.replace('Z', '+00:00'))
-        end_datetime = datetime.fromisoformat(end_datetime_str.replace('Z', '+00:00'))
-
-        # Schedule reminder if needed
-        if reminder_minutes > 0:
-            schedule = self.schedule_module.get_schedule(user_id, schedule_name)
-            if schedule:
-                self.reminder_service.schedule_reminder(schedule)
+        start_datetime = schedule.start_datetime
+        end_datetime = schedule.end_datetime
 
         # Build success message with HTML formatting
         message_parts = [
-            "✅ <b>Schedule saved successfully!</b>\n",
+            SCHEDULE_SAVED_HEADER,
             f"📅 <b>{self._escape_html(title)}</b>",
-            f"🕐 {start_datetime.strftime('%Y-%m-%d %H:%M')} - {end_datetime.strftime('%H:%M')}",
-            f"⏰ Reminder: {reminder_minutes} min before" if reminder_minutes else "",
+            f"🕐 {format_datetime(start_datetime)} - {format_time(end_datetime)}",
         ]
+        if reminder_minutes:
+            message_parts.append(f"⏰ Reminder: {reminder_minutes} min before")
 
         # Add markdown preview for description
         if description:
-            html_preview = self._render_markdown_preview(description, max_length=200)
+            html_preview = await self._render_markdown_preview(description, max_length=200)
             if html_preview:
                 message_parts.append(f"\n{html_preview}")
 
-        await update.effective_message.reply_text(
-            '\n'.join(filter(None, message_parts)),
+        reply = update.effective_message.reply_text(
+            '\n'.join(message_parts),
             parse_mode='HTML'
         )
 
+        # Schedule reminder if needed; the reminder insert runs in a worker
+        # thread while the confirmation goes out to Telegram
+        if reminder_minutes > 0:
+            await asyncio.gather(
+                asyncio.to_thread(self.reminder_service.schedule_reminder, schedule),
+                reply
+            )
+        else:
+            await reply
+
         logger.info(f"Schedule '{schedule_name}' saved successfully for user {user_id} via Web App")
 
     async def handle_notes_page_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -515,11 +678,11 @@ class TelegramNoteBot:
         # Extract page number from callback data (format: "notes_page:0")
         page = int(query.data.split(':')[1])
 
-        # Get paginator from context
+        # Get the listing's paginator from context
         paginator = context.user_data.get('notes_paginator')
         keyword = context.user_data.get('notes_keyword')
 
-        if not paginator:
+        if paginator is None:
             await query.edit_message_text("Session expired. Please use /notes again.")
             return
 
@@ -532,9 +695,7 @@ class TelegramNoteBot:
 
         # Update message with new keyboard
         filter_msg = f" (filtered by: {keyword})" if keyword else ""
-        header = f"📝 Your Notes{filter_msg}\n"
-        header += f"Showing {len(paginator.items)} note(s)\n\n"
-        header += "Tap a note to view or edit it:"
+        header = NOTES_HEADER_TMPL.format(filter=filter_msg, n=len(paginator.item_ids))
 
         await query.edit_message_text(
             header,
@@ -549,11 +710,11 @@ class TelegramNoteBot:
         # Extract page number from callback data (format: "schedules_page:0")
         page = int(query.data.split(':')[1])
 
-        # Get paginator from context
+        # Get the listing's paginator from context
         paginator = context.user_data.get('schedules_paginator')
         period = context.user_data.get('schedules_period')
 
-        if not paginator:
+        if paginator is None:
             await query.edit_message_text("Session expired. Please use /schedules again.")
             return
 
@@ -566,9 +727,7 @@ class TelegramNoteBot:
 
         # Update message with new keyboard
         filter_msg = f" (period: {period})" if period else ""
-        header = f"📅 Your Schedules{filter_msg}\n"
-        header += f"Showing {len(paginator.items)} schedule(s)\n\n"
-        header += "Tap a schedule to view or edit it:"
+        header = SCHEDULES_HEADER_TMPL.format(filter=filter_msg, n=len(paginator.item_ids))
 
         await query.edit_message_text(
             header,
@@ -590,49 +749,14 @@ class TelegramNoteBot:
             await query.edit_message_text("Note not found.")
             return
 
-        # Build URL with note data
-        params = {'name': note_name}
-        if note:
-            params['title'] = note.title
-            params['tags'] = ','.join(note.tags) if note.tags else ''
-            params['content'] = note.content
-
-        # Add security token
-        params['_token'] = self.webapp_server.generate_token()
-
-        webapp_url = f"{self.webapp_server.get_url('note_editor.html', base_url=Config.WEBAPP_BASE_URL)}?{urlencode(params)}"
-
-        # Create reply keyboard with Web App button
-        keyboard = [[KeyboardButton(
-            text="📝 Edit Note",
-            web_app=WebAppInfo(url=webapp_url)
-        )]]
-        reply_markup = ReplyKeyboardMarkup(
-            keyboard,
-            one_time_keyboard=True,
-            resize_keyboard=True
-        )
-
-        # Build message with HTML formatting
-        message_parts = [
-            f"📝 <b>Note: {self._escape_html(note.name)}</b>\n",
-            f"<b>{self._escape_html(note.title)}</b>",
-            f"🏷 Tags: {', '.join(self._escape_html(t) for t in note.tags)}" if note.tags else "🏷 Tags: None",
-        ]
-
-        # Add markdown preview
-        html_preview = self._render_markdown_preview(note.content)
-        if html_preview:
-            message_parts.append(f"\n{html_preview}")
-
-        message_parts.append("\n<i>Tap the button below to edit this note in a rich editor</i>")
+        message, reply_markup, parse_mode = await self._render_note_view(note_name, note)
 
         # Send new message (can't edit inline keyboard message to add reply keyboard)
         await context.bot.send_message(
             chat_id=query.message.chat_id,
-            text='\n'.join(message_parts),
+            text=message,
             reply_markup=reply_markup,
-            parse_mode='HTML'
+            parse_mode=parse_mode
         )
 
     async def handle_view_schedule_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -650,54 +774,14 @@ class TelegramNoteBot:
             await query.edit_message_text("Schedule not found.")
             return
 
-        # Build URL with schedule data
-        params = {
-            'name': schedule_name,
-            'title': schedule.title,
-            'start_datetime': schedule.start_datetime.isoformat(),
-            'end_datetime': schedule.end_datetime.isoformat(),
-            'reminder_minutes': str(schedule.reminder_minutes) if schedule.reminder_minutes else '0',
-            'description': schedule.description
-        }
-
-        # Add security token
-        params['_token'] = self.webapp_server.generate_token()
-
-        webapp_url = f"{self.webapp_server.get_url('schedule_editor.html', base_url=Config.WEBAPP_BASE_URL)}?{urlencode(params)}"
-
-        # Create reply keyboard with Web App button
-        keyboard = [[KeyboardButton(
-            text="📅 Edit Schedule",
-            web_app=WebAppInfo(url=webapp_url)
-        )]]
-        reply_markup = ReplyKeyboardMarkup(
-            keyboard,
-            one_time_keyboard=True,
-            resize_keyboard=True
-        )
-
-        # Build message with HTML formatting
-        message_parts = [
-            f"📅 <b>Schedule: {self._escape_html(schedule.name)}</b>\n",
-            f"<b>{self._escape_html(schedule.title)}</b>",
-            f"🕐 {schedule.start_datetime.strftime('%Y-%m-%d %H:%M')} - {schedule.end_datetime.strftime('%H:%M')}",
-            f"⏰ Reminder: {schedule.reminder_minutes} min before" if schedule.reminder_minutes else "",
-        ]
-
-        # Add markdown preview for description
-        if schedule.description:
-            html_preview = self._render_markdown_preview(schedule.description)
-            if html_preview:
-                message_parts.append(f"\n{html_preview}")
-
-        message_parts.append("\n<i>Tap the button below to edit this schedule in a rich editor</i>")
+        message, reply_markup, parse_mode = await self._render_schedule_view(schedule_name, schedule)
 
         # Send new message (can't edit inline keyboard message to add reply keyboard)
         await context.bot.send_message(
             chat_id=query.message.chat_id,
-            text='\n'.join(filter(None, message_parts)),
+            text=message,
             reply_markup=reply_markup,
-            parse_mode='HTML'
+            parse_mode=parse_mode
         )
 
     async def handle_noop_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -707,13 +791,19 @@ class TelegramNoteBot:
 
     async def debug_handler(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Debug handler to see what updates we receive."""
+        # Skip formatting the (large) update repr unless it will be logged
+        if not logger.isEnabledFor(logging.INFO):
+            return
+
         logger.info(f"=== DEBUG: Received update type: {type(update)}")
         logger.info(f"=== DEBUG: Update object: {update}")
-        if hasattr(update, 'message') and update.message:
-            logger.info(f"=== DEBUG: Message type: {type(update.message)}")
-            logger.info(f"=== DEBUG: Has web_app_data: {hasattr(update.message, 'web_app_data')}")
-            if hasattr(update.message, 'web_app_data') and update.message.web_app_data:
-                logger.info(f"=== DEBUG: Web App Data found! {update.message.web_app_data.data[:100]}")
+        message = getattr(update, 'message', None)
+        if message:
+            web_app_data = getattr(message, 'web_app_data', None)
+            logger.info(f"=== DEBUG: Message type: {type(message)}")
+            logger.info(f"=== DEBUG: Has web_app_data: {web_app_data is not None}")
+            if web_app_data:
+                logger.info(f"=== DEBUG: Web App Data found! {web_app_data.data[:100]}")
 
     async def handle_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle text messages for editing notes and schedules."""
@@ -778,9 +868,19 @@ class TelegramNoteBot:
                 await update.message.reply_text(f"❌ Error saving schedule: {str(e)}")
 
     async def post_init(self, application: Application):
-        """Post-initialization callback to set up commands."""
+        """Post-initialization callback to set up commands and reminders."""
+        # The reminder scheduler runs on the application's event loop, so
+        # it can only be started once that loop is running
+        self.reminder_service.start(application)
         await self.setup_commands(application)
 
+    async def post_shutdown(self, application: Application):
+        """Post-shutdown callback to stop reminders, the markdown render pool and the database."""
+        self.reminder_service.stop()
+        self._md_pool.shutdown(wait=False, cancel_futures=True)
+        # Last, so the WAL is checkpointed once nothing else can write
+        self.db.close()
+
     def run(self):
         """Run the bot."""
         # Start Web App server
@@ -793,45 +893,45 @@ class TelegramNoteBot:
         # Create application
         application = Application.builder().token(Config.TELEGRAM_BOT_TOKEN).build()
 
-        # Add handlers
-        application.add_handler(CommandHandler("start", self.start))
-        application.add_handler(CommandHandler("help", self.help_command))
-        application.add_handler(CommandHandler("version", self.version_command))
-        application.add_handler(CommandHandler("notes", self.notes_command))
-        application.add_handler(CommandHandler("note", self.note_command))
-        application.add_handler(CommandHandler("schedules", self.schedules_command))
-        application.add_handler(CommandHandler("schedule", self.schedule_command))
-        application.add_handler(CommandHandler("delete", self.delete_command))
-
-        # Callback query handlers for pagination and item selection
-        application.add_handler(CallbackQueryHandler(self.handle_notes_page_callback, pattern=r'^notes_page:\d+$'))
-        application.add_handler(CallbackQueryHandler(self.handle_schedules_page_callback, pattern=r'^schedules_page:\d+$'))
-        application.add_handler(CallbackQueryHandler(self.handle_view_note_callback, pattern=r'^view_note:'))
-        application.add_handler(CallbackQueryHandler(self.handle_view_schedule_callback, pattern=r'^view_schedule:'))
-        application.add_handler(CallbackQueryHandler(self.handle_noop_callback, pattern=r'^noop$'))
+        # Add handlers; one command handler and one callback handler
+        # dispatch through the tables built in __init__
+        application.add_handler(CommandHandler(list(self._command_map), self._dispatch_command))
+
+        # Callback query handler for pagination and item selection
+        application.add_handler(CallbackQueryHandler(self._dispatch_callback, pattern=CALLBACK_DATA_RE))
 
         # Web App data handler - try multiple filter combinations
         application.add_handler(MessageHandler(filters.StatusUpdate.WEB_APP_DATA, self.handle_web_app_data))
 
-        # Debug: Catch all messages to see what we're receiving
-        from telegram.ext import TypeHandler
-        application.add_handler(TypeHandler(Update, self.debug_handler), group=99)
+        # Debug: Catch all messages to see what we're receiving. Off by
+        # default, since it runs an extra handler for every update.
+        if Config.DEBUG:
+            from telegram.ext import TypeHandler
+            application.add_handler(TypeHandler(Update, self.debug_handler), group=99)
 
         application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, self.handle_message))
 
-        # Start reminder service
-        self.reminder_service.start(application)
-
-        # Set up post_init callback for command registration
+        # Set up post_init callback for command registration and reminders
         application.post_init = self.post_init
+        application.post_shutdown = self.post_shutdown
 
         # Start the bot
         logger.info("Starting Telegram Note bot...")
-        application.run_polling(allowed_updates=Update.ALL_TYPES)
+        # Long-poll for 30s so idle periods don't cost a getUpdates round-trip
+        # every few seconds; keep retrying if Telegram is unreachable at startup
+        application.run_polling(
+            allowed_updates=Update.ALL_TYPES,
+            timeout=30,
+            poll_interval=0.0,
+            bootstrap_retries=-1
+        )
 
 
 def main():
     """Main entry point."""
+    # Swap in the libuv-based event loop before the application creates one
+    if uvloop is not None:
+        uvloop.install()
     bot = TelegramNoteBot()
     bot.run()
 
@@ -1,40 +1,191 @@
 """Database connection and initialization."""
 
+import queue
 import sqlite3
 import os
+import threading
 from contextlib import contextmanager
-from typing import Generator
+from typing import Generator, Optional, Tuple, Union
+from urllib.request import pathname2url
+
+from .note import Note
+from .schedule import Schedule
+
+# Applied to every new connection. WAL lets readers run alongside the
+# writer; the rest trade strict durability for fewer fsyncs and keep
+# temp structures and hot pages in memory.
+CONNECTION_PRAGMAS = """
+    PRAGMA journal_mode = WAL;
+    PRAGMA synchronous = NORMAL;
+    PRAGMA temp_store = MEMORY;
+    PRAGMA mmap_size = 268435456;
+    PRAGMA cache_size = -20000;
+    PRAGMA foreign_keys = ON;
+"""
+
+# Column definitions for the reminders table, shared by the initial
+# CREATE and the reminders migration. reminder_time holds Unix epoch
+# seconds (UTC) so pending-reminder scans compare plain integers. Each
+# schedule has at most one reminder row, which re-saves update in place.
+# Keep this table free of triggers and generated columns so reminder
+# rows can be written in bulk with executemany().
+REMINDERS_COLUMNS = """(
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    schedule_id INTEGER NOT NULL,
+    reminder_time INTEGER NOT NULL,
+    sent BOOLEAN DEFAULT FALSE,
+    sent_at TIMESTAMP,
+    UNIQUE(schedule_id),
+    FOREIGN KEY (schedule_id) REFERENCES schedules(id) ON DELETE CASCADE
+)"""
+
+
+# RETURNING (SQLite 3.35+) lets an UPSERT hand back the stored row; older
+# builds re-select it on the same connection instead
+SUPPORTS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# Looks a name up in notes and schedules with a single statement. Both
+# branches project the same NULL-padded column list so each row can be
+# handed to Note.from_db_row or Schedule.from_db_row unchanged.
+FIND_BY_NAME_SQL = """
+    SELECT 'note' AS kind, id, user_id, name, title, tags, content,
+           NULL AS description, NULL AS start_datetime,
+           NULL AS end_datetime, NULL AS reminder_minutes,
+           created_at, updated_at
+    FROM notes WHERE user_id = ? AND name = ?
+    UNION ALL
+    SELECT 'schedule' AS kind, id, user_id, name, title, NULL, NULL,
+           description, start_datetime, end_datetime, reminder_minutes,
+           created_at, updated_at
+    FROM schedules WHERE user_id = ? AND name = ?
+    ORDER BY kind
+    LIMIT 1
+"""
+
+
+def get_sqlite_connection(db_path: str, **kwargs) -> sqlite3.Connection:
+    """Open a SQLite connection with the standard PRAGMAs applied.
+
+    Args:
+        db_path: Path to SQLite database file
+        **kwargs: Extra keyword arguments passed to sqlite3.connect
+
+    Returns:
+        sqlite3.Connection: Configured database connection
+    """
+    conn = sqlite3.connect(db_path, **kwargs)
+    conn.executescript(CONNECTION_PRAGMAS)
+    return conn
 
 
 class Database:
-    """SQLite database manager."""
+    """SQLite database manager.
+
+    Writes go through a single long-lived connection serialized by a lock.
+    Reads use a small pool of read-only connections, which WAL mode lets
+    run concurrently with the writer.
+    """
 
-    def __init__(self, db_path: str = "telegram_note.db"):
+    def __init__(self, db_path: str = "telegram_note.db", readers: int = 4):
         """Initialize database connection.
 
         Args:
             db_path: Path to SQLite database file
+            readers: Number of pooled read-only connections
         """
         self.db_path = db_path
+        self._write_lock = threading.RLock()
+        self._write_conn = self._connect()
         self.init_db()
 
+        # Readers are opened read-only at the file level (mode=ro), after
+        # init_db so the schema and WAL mode already exist
+        self._readers = queue.Queue()
+        for _ in range(readers):
+            self._readers.put(self._connect(readonly=True))
+
+    def _connect(self, readonly: bool = False) -> sqlite3.Connection:
+        """Open a pooled connection usable from any thread.
+
+        Args:
+            readonly: Open the database file in read-only mode
+
+        Returns:
+            sqlite3.Connection: Configured database connection
+        """
+        if readonly:
+            uri = f"file:{pathname2url(os.path.abspath(self.db_path))}?mode=ro"
+            conn = get_sqlite_connection(uri, uri=True, check_same_thread=False)
+        else:
+            conn = get_sqlite_connection(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        return conn
+
     @contextmanager
     def get_connection(self) -> Generator[sqlite3.Connection, None, None]:
-        """Get database connection context manager.
+        """Get the write connection context manager.
+
+        The connection is held exclusively for the duration of the block
+        and committed on exit (rolled back on error).
 
         Yields:
             sqlite3.Connection: Database connection
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        with self._write_lock:
+            conn = self._write_conn
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+    @contextmanager
+    def get_readonly_connection(self) -> Generator[sqlite3.Connection, None, None]:
+        """Borrow a read-only connection from the pool.
+
+        Yields:
+            sqlite3.Connection: Read-only database connection
+        """
+        conn = self._readers.get()
         try:
             yield conn
-            conn.commit()
-        except Exception:
-            conn.rollback()
-            raise
         finally:
-            conn.close()
+            self._readers.put(conn)
+
+    def close(self):
+        """Close all pooled readers and the write connection.
+
+        The read-only readers can't checkpoint, so they are closed first
+        and the writer folds the WAL back into the main file before it
+        closes, leaving a self-contained database on disk.
+        """
+        while not self._readers.empty():
+            self._readers.get_nowait().close()
+        with self._write_lock:
+            self._write_conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._write_conn.close()
+
+    def find_by_name(self, user_id: int, name: str) -> Optional[Tuple[str, Union[Note, Schedule]]]:
+        """Find a note or schedule by name in one query.
+
+        Notes take precedence when both kinds share the name.
+
+        Args:
+            user_id: Telegram user ID
+            name: Note or schedule name
+
+        Returns:
+            Tuple of ('note', Note) or ('schedule', Schedule), or None if not found
+        """
+        with self.get_readonly_connection() as conn:
+            row = conn.execute(FIND_BY_NAME_SQL, (user_id, name, user_id, name)).fetchone()
+
+        if row is None:
+            return None
+        if row['kind'] == 'note':
+            return 'note', Note.from_db_row(row)
+        return 'schedule', Schedule.from_db_row(row)
 
     def init_db(self):
         """Initialize database schema."""
@@ -56,6 +207,43 @@ class Database:
                 )
             """)
 
+            # Full-text index over notes for keyword search. It is an
+            # external-content table (rows live only in notes), kept in sync
+            # by the triggers below; a freshly created index is rebuilt from
+            # the notes already on disk.
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'notes_fts'"
+            )
+            fts_exists = cursor.fetchone() is not None
+            cursor.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+                    name, title, tags, content,
+                    content='notes', content_rowid='id'
+                )
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS notes_ai AFTER INSERT ON notes BEGIN
+                    INSERT INTO notes_fts(rowid, name, title, tags, content)
+                    VALUES (new.id, new.name, new.title, new.tags, new.content);
+                END
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS notes_ad AFTER DELETE ON notes BEGIN
+                    INSERT INTO notes_fts(notes_fts, rowid, name, title, tags, content)
+                    VALUES ('delete', old.id, old.name, old.title, old.tags, old.content);
+                END
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS notes_au AFTER UPDATE ON notes BEGIN
+                    INSERT INTO notes_fts(notes_fts, rowid, name, title, tags, content)
+                    VALUES ('delete', old.id, old.name, old.title, old.tags, old.content);
+                    INSERT INTO notes_fts(rowid, name, title, tags, content)
+                    VALUES (new.id, new.name, new.title, new.tags, new.content);
+                END
+            """)
+            if not fts_exists:
+                cursor.execute("INSERT INTO notes_fts(notes_fts) VALUES ('rebuild')")
+
             # Create schedules table
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS schedules (
@@ -74,15 +262,88 @@ class Database:
             """)
 
             # Create reminders table to track sent reminders
+            cursor.execute(f"CREATE TABLE IF NOT EXISTS reminders {REMINDERS_COLUMNS}")
+            self._migrate_reminders(cursor)
+
+            # Partial index over unsent reminders only; sent rows dominate
+            # the table over time and never need to be scanned by time.
+            # Queries must use "sent = 0" for the planner to match it.
+            # Walking it yields rows in reminder_time order, so
+            # "ORDER BY reminder_time" needs no temp B-tree sort; a
+            # separate (sent, reminder_time) index would only add writes.
             cursor.execute("""
-                CREATE TABLE IF NOT EXISTS reminders (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    schedule_id INTEGER NOT NULL,
-                    reminder_time TIMESTAMP NOT NULL,
-                    sent BOOLEAN DEFAULT FALSE,
-                    sent_at TIMESTAMP,
-                    FOREIGN KEY (schedule_id) REFERENCES schedules(id) ON DELETE CASCADE
-                )
+                CREATE INDEX IF NOT EXISTS idx_reminders_unsent
+                ON reminders(reminder_time) WHERE sent = 0
+            """)
+
+            # List queries filter by user_id and sort by "updated_at DESC,
+            # id DESC". Walking this index backwards yields exactly that
+            # order (the rowid is the implicit last column), so listing IDs
+            # is a covering index range scan with no temp B-tree sort.
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_notes_user_updated
+                ON notes(user_id, updated_at)
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_schedules_user_updated
+                ON schedules(user_id, updated_at)
+            """)
+
+            # Upcoming-schedule lookups range-scan start_datetime per user
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_sched_user_start
+                ON schedules(user_id, start_datetime)
             """)
 
             conn.commit()
+
+    @staticmethod
+    def _migrate_reminders(cursor: sqlite3.Cursor):
+        """Rebuild an outdated reminders table in the current layout.
+
+        Older databases stored reminder_time as local-time ISO strings and
+        allowed several rows per schedule, one per save. SQLite cannot
+        change a column type or add a constraint in place, so the table is
+        rebuilt: existing values are converted from local time to UTC and
+        only the newest row of each existing schedule is kept.
+
+        Args:
+            cursor: Cursor on the connection running the schema setup
+        """
+        cursor.execute("PRAGMA table_info(reminders)")
+        column_types = {row['name']: row['type'].upper() for row in cursor.fetchall()}
+        if column_types.get('reminder_time') == 'INTEGER' and Database._has_unique_schedule_id(cursor):
+            return
+
+        cursor.execute(f"CREATE TABLE reminders_new {REMINDERS_COLUMNS}")
+        cursor.execute("""
+            INSERT INTO reminders_new (id, schedule_id, reminder_time, sent, sent_at)
+            SELECT id, schedule_id,
+                   CASE WHEN typeof(reminder_time) = 'integer' THEN reminder_time
+                        ELSE CAST(strftime('%s', reminder_time, 'utc') AS INTEGER)
+                   END,
+                   sent, sent_at
+            FROM reminders
+            WHERE id IN (SELECT MAX(id) FROM reminders GROUP BY schedule_id)
+              AND schedule_id IN (SELECT id FROM schedules)
+        """)
+        cursor.execute("DROP TABLE reminders")
+        cursor.execute("ALTER TABLE reminders_new RENAME TO reminders")
+
+    @staticmethod
+    def _has_unique_schedule_id(cursor: sqlite3.Cursor) -> bool:
+        """Check whether reminders has a unique index on schedule_id alone.
+
+        Args:
+            cursor: Cursor on the connection running the schema setup
+
+        Returns:
+            True if such an index exists
+        """
+        cursor.execute("PRAGMA index_list(reminders)")
+        unique_indexes = [row['name'] for row in cursor.fetchall() if row['unique']]
+        for name in unique_indexes:
+            cursor.execute(f"PRAGMA index_info(\"{name}\")")
+            if [row['name'] for row in cursor.fetchall()] == ['schedule_id']:
+                return True
+        return False
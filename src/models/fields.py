@@ -0,0 +1,29 @@
+"""Field helpers shared by the data models."""
+
+from datetime import datetime
+from typing import Optional, Union
+
+
+class LazyTimestamp:
+    """Dataclass field descriptor that parses ISO timestamps on first access.
+
+    Rows from SQLite carry timestamps as ISO strings. Storing the string and
+    parsing it only when read keeps list queries from paying for
+    datetime.fromisoformat on columns that are never displayed.
+    """
+
+    def __set_name__(self, owner, name):
+        self._attr = f"_{name}"
+
+    def __get__(self, obj, objtype=None) -> Optional[datetime]:
+        if obj is None:
+            # Class-level access: dataclasses reads this as the field default
+            return None
+        value = obj.__dict__.get(self._attr)
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value)
+            obj.__dict__[self._attr] = value
+        return value
+
+    def __set__(self, obj, value: Union[datetime, str, None]):
+        obj.__dict__[self._attr] = value or None
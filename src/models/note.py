@@ -4,6 +4,8 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import List, Optional
 
+from .fields import LazyTimestamp
+
 
 @dataclass
 class Note:
@@ -15,8 +17,9 @@ class Note:
     title: str
     tags: List[str]
     content: str
-    created_at: Optional[datetime] = None
-    updated_at: Optional[datetime] = None
+    # Accept datetimes or raw ISO strings; strings are parsed on first access
+    created_at: Optional[datetime] = LazyTimestamp()
+    updated_at: Optional[datetime] = LazyTimestamp()
 
     @classmethod
     def from_db_row(cls, row) -> 'Note':
@@ -36,8 +39,8 @@ class Note:
             title=row['title'],
             tags=tags,
             content=row['content'] or '',
-            created_at=datetime.fromisoformat(row['created_at']) if row['created_at'] else None,
-            updated_at=datetime.fromisoformat(row['updated_at']) if row['updated_at'] else None
+            created_at=row['created_at'],
+            updated_at=row['updated_at']
         )
 
     def tags_to_string(self) -> str:
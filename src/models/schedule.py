@@ -4,6 +4,8 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
 
+from .fields import LazyTimestamp
+
 
 @dataclass
 class Schedule:
@@ -17,8 +19,9 @@ class Schedule:
     start_datetime: datetime
     end_datetime: datetime
     reminder_minutes: Optional[int]
-    created_at: Optional[datetime] = None
-    updated_at: Optional[datetime] = None
+    # Accept datetimes or raw ISO strings; strings are parsed on first access
+    created_at: Optional[datetime] = LazyTimestamp()
+    updated_at: Optional[datetime] = LazyTimestamp()
 
     @classmethod
     def from_db_row(cls, row) -> 'Schedule':
@@ -39,6 +42,6 @@ class Schedule:
             start_datetime=datetime.fromisoformat(row['start_datetime']),
             end_datetime=datetime.fromisoformat(row['end_datetime']),
             reminder_minutes=row['reminder_minutes'],
-            created_at=datetime.fromisoformat(row['created_at']) if row['created_at'] else None,
-            updated_at=datetime.fromisoformat(row['updated_at']) if row['updated_at'] else None
+            created_at=row['created_at'],
+            updated_at=row['updated_at']
         )
@@ -1,13 +1,46 @@
 """Note module for CRUD operations on notes."""
 
-from typing import List, Optional
+from typing import List, Optional, Tuple
 import logging
+import sqlite3
+import threading
+from collections import OrderedDict
 
-from models.database import Database
+from models.database import SUPPORTS_RETURNING, Database
 from models.note import Note
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of notes kept in the get_note() LRU cache
+NOTE_CACHE_SIZE = 512
+
+# Insert-or-update keyed on the (user_id, name) UNIQUE constraint
+UPSERT_NOTE_SQL = """
+    INSERT INTO notes
+    (user_id, name, title, tags, content)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(user_id, name) DO UPDATE SET
+        title = excluded.title,
+        tags = excluded.tags,
+        content = excluded.content,
+        updated_at = CURRENT_TIMESTAMP
+""" + ("RETURNING *" if SUPPORTS_RETURNING else "")
+
+
+def _fts_prefix_query(keyword: str) -> str:
+    """Build an FTS5 query matching notes containing every word of keyword.
+
+    Each word is quoted (so FTS5 operators in user input are taken
+    literally) and matched as a token prefix.
+
+    Args:
+        keyword: Search text from the user
+
+    Returns:
+        FTS5 MATCH expression
+    """
+    return ' '.join('"' + word.replace('"', '""') + '"*' for word in keyword.split())
+
 
 class NoteModule:
     """Handle note operations."""
@@ -19,10 +52,17 @@ class NoteModule:
             db: Database instance
         """
         self.db = db
+        # (user_id, name) -> Note, most recently used last. Entries are
+        # dropped whenever the note is saved or deleted.
+        self._note_cache: "OrderedDict[Tuple[int, str], Note]" = OrderedDict()
+        self._cache_lock = threading.Lock()
 
     def get_note(self, user_id: int, name: str) -> Optional[Note]:
         """Get a note by user ID and name.
 
+        Found notes are served from an LRU cache until they are next saved
+        or deleted through this module.
+
         Args:
             user_id: Telegram user ID
             name: Note name
@@ -30,47 +70,117 @@ class NoteModule:
         Returns:
             Note instance or None if not found
         """
-        with self.db.get_connection() as conn:
+        key = (user_id, name)
+        with self._cache_lock:
+            note = self._note_cache.get(key)
+            if note is not None:
+                self._note_cache.move_to_end(key)
+                return note
+
+        with self.db.get_readonly_connection() as conn:
+            note = self._get_note_conn(conn, user_id, name)
+
+        if note is not None:
+            with self._cache_lock:
+                self._note_cache[key] = note
+                if len(self._note_cache) > NOTE_CACHE_SIZE:
+                    self._note_cache.popitem(last=False)
+        return note
+
+    def _invalidate(self, user_id: int, name: str):
+        """Drop a cached note after it has been written.
+
+        Args:
+            user_id: Telegram user ID
+            name: Note name
+        """
+        with self._cache_lock:
+            self._note_cache.pop((user_id, name), None)
+
+    @staticmethod
+    def _get_note_conn(conn: sqlite3.Connection, user_id: int, name: str) -> Optional[Note]:
+        """Get a note by user ID and name on an already-held connection.
+
+        Args:
+            conn: Open database connection
+            user_id: Telegram user ID
+            name: Note name
+
+        Returns:
+            Note instance or None if not found
+        """
+        row = conn.execute(
+            "SELECT * FROM notes WHERE user_id = ? AND name = ?",
+            (user_id, name)
+        ).fetchone()
+        return Note.from_db_row(row) if row else None
+
+    @staticmethod
+    def _filter_clause(user_id: int, keyword: Optional[str]) -> Tuple[str, tuple]:
+        """Build the WHERE clause shared by the note list queries.
+
+        Args:
+            user_id: Telegram user ID
+            keyword: Optional keyword or tag to filter by
+
+        Returns:
+            Tuple of (where_sql, params)
+        """
+        if keyword and not keyword.isspace():
+            # Search name, title, tags and content through the FTS index
+            return (
+                "WHERE user_id = ? AND id IN (SELECT rowid FROM notes_fts WHERE notes_fts MATCH ?)",
+                (user_id, _fts_prefix_query(keyword))
+            )
+        return "WHERE user_id = ?", (user_id,)
+
+    def list_note_ids(self, user_id: int, keyword: Optional[str] = None) -> List[int]:
+        """List matching note IDs for a user, most recently updated first.
+
+        Lets callers page through results while holding only IDs in memory.
+
+        Args:
+            user_id: Telegram user ID
+            keyword: Optional keyword or tag to filter by
+
+        Returns:
+            List of note IDs
+        """
+        where, params = self._filter_clause(user_id, keyword)
+
+        with self.db.get_readonly_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                "SELECT * FROM notes WHERE user_id = ? AND name = ?",
-                (user_id, name)
+                f"SELECT id FROM notes {where} ORDER BY updated_at DESC, id DESC",
+                params
             )
-            row = cursor.fetchone()
-            return Note.from_db_row(row) if row else None
+            return [row[0] for row in cursor]
+
+    def get_notes_by_ids(self, user_id: int, ids: List[int]) -> List[Note]:
+        """Get notes by ID, preserving the order of ``ids``.
 
-    def list_notes(self, user_id: int, keyword: Optional[str] = None) -> List[Note]:
-        """List notes for a user, optionally filtered by keyword/tag.
+        IDs that no longer exist (e.g. deleted since they were listed) are skipped.
 
         Args:
             user_id: Telegram user ID
-            keyword: Optional keyword or tag to filter by
+            ids: Note IDs to fetch
 
         Returns:
             List of Note instances
         """
-        with self.db.get_connection() as conn:
-            cursor = conn.cursor()
+        if not ids:
+            return []
 
-            if keyword:
-                # Search in name, title, tags, and content
-                cursor.execute(
-                    """
-                    SELECT * FROM notes
-                    WHERE user_id = ?
-                    AND (name LIKE ? OR title LIKE ? OR tags LIKE ? OR content LIKE ?)
-                    ORDER BY updated_at DESC
-                    """,
-                    (user_id, f"%{keyword}%", f"%{keyword}%", f"%{keyword}%", f"%{keyword}%")
-                )
-            else:
-                cursor.execute(
-                    "SELECT * FROM notes WHERE user_id = ? ORDER BY updated_at DESC",
-                    (user_id,)
-                )
+        placeholders = ','.join('?' * len(ids))
+        with self.db.get_readonly_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"SELECT * FROM notes WHERE user_id = ? AND id IN ({placeholders})",
+                (user_id, *ids)
+            )
+            by_id = {row['id']: Note.from_db_row(row) for row in cursor}
 
-            rows = cursor.fetchall()
-            return [Note.from_db_row(row) for row in rows]
+        return [by_id[i] for i in ids if i in by_id]
 
     def save_note(
         self,
@@ -98,36 +208,21 @@ class NoteModule:
         tags_str = ','.join(tags) if tags else ''
 
         with self.db.get_connection() as conn:
-            cursor = conn.cursor()
-
-            # Check if note exists
-            existing = self.get_note(user_id, name)
-
-            if existing:
-                # Update existing note
-                cursor.execute(
-                    """
-                    UPDATE notes
-                    SET title = ?, tags = ?, content = ?, updated_at = CURRENT_TIMESTAMP
-                    WHERE user_id = ? AND name = ?
-                    """,
-                    (title, tags_str, content, user_id, name)
-                )
-                logger.info(f"Updated note '{name}' for user {user_id}")
+            # Insert or update in one statement via the (user_id, name)
+            # UNIQUE constraint, reading the stored row back on the same
+            # connection
+            cursor = conn.execute(
+                UPSERT_NOTE_SQL,
+                (user_id, name, title, tags_str, content)
+            )
+            if SUPPORTS_RETURNING:
+                note = Note.from_db_row(cursor.fetchone())
             else:
-                # Create new note
-                cursor.execute(
-                    """
-                    INSERT INTO notes (user_id, name, title, tags, content)
-                    VALUES (?, ?, ?, ?, ?)
-                    """,
-                    (user_id, name, title, tags_str, content)
-                )
-                logger.info(f"Created note '{name}' for user {user_id}")
-
-            conn.commit()
+                note = self._get_note_conn(conn, user_id, name)
 
-        return self.get_note(user_id, name)
+        self._invalidate(user_id, name)
+        logger.info(f"Saved note '{name}' for user {user_id}")
+        return note
 
     def delete_note(self, user_id: int, name: str) -> bool:
         """Delete a note.
@@ -140,15 +235,18 @@ class NoteModule:
             True if deleted, False if not found
         """
         with self.db.get_connection() as conn:
+            # The FTS delete trigger runs in the same immediate transaction
+            if not conn.in_transaction:
+                conn.execute("BEGIN IMMEDIATE")
             cursor = conn.cursor()
             cursor.execute(
                 "DELETE FROM notes WHERE user_id = ? AND name = ?",
                 (user_id, name)
             )
-            conn.commit()
             deleted = cursor.rowcount > 0
 
-            if deleted:
-                logger.info(f"Deleted note '{name}' for user {user_id}")
+        if deleted:
+            self._invalidate(user_id, name)
+            logger.info(f"Deleted note '{name}' for user {user_id}")
 
-            return deleted
+        return deleted
@@ -1,29 +1,60 @@
 """Schedule module for CRUD operations on schedules."""
 
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from datetime import datetime
 import logging
+import sqlite3
+import threading
+from collections import OrderedDict
 
-from models.database import Database
+from models.database import SUPPORTS_RETURNING, Database
 from models.schedule import Schedule
+from services.reminder_service import ReminderService
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of schedules kept in the get_schedule() LRU cache
+SCHEDULE_CACHE_SIZE = 512
+
+# Insert-or-update keyed on the (user_id, name) UNIQUE constraint
+UPSERT_SCHEDULE_SQL = """
+    INSERT INTO schedules
+    (user_id, name, title, description, start_datetime, end_datetime, reminder_minutes)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(user_id, name) DO UPDATE SET
+        title = excluded.title,
+        description = excluded.description,
+        start_datetime = excluded.start_datetime,
+        end_datetime = excluded.end_datetime,
+        reminder_minutes = excluded.reminder_minutes,
+        updated_at = CURRENT_TIMESTAMP
+""" + ("RETURNING *" if SUPPORTS_RETURNING else "")
+
 
 class ScheduleModule:
     """Handle schedule operations."""
 
-    def __init__(self, db: Database):
+    def __init__(self, db: Database, reminder_service: Optional[ReminderService] = None):
         """Initialize schedule module.
 
         Args:
             db: Database instance
+            reminder_service: Reminder service whose jobs are cancelled
+                when a schedule is deleted
         """
         self.db = db
+        self.reminder_service = reminder_service
+        # (user_id, name) -> Schedule, most recently used last. Entries are
+        # dropped whenever the schedule is saved or deleted.
+        self._schedule_cache: "OrderedDict[Tuple[int, str], Schedule]" = OrderedDict()
+        self._cache_lock = threading.Lock()
 
     def get_schedule(self, user_id: int, name: str) -> Optional[Schedule]:
         """Get a schedule by user ID and name.
 
+        Found schedules are served from an LRU cache until they are next saved
+        or deleted through this module.
+
         Args:
             user_id: Telegram user ID
             name: Schedule name
@@ -31,49 +62,120 @@ class ScheduleModule:
         Returns:
             Schedule instance or None if not found
         """
-        with self.db.get_connection() as conn:
+        key = (user_id, name)
+        with self._cache_lock:
+            schedule = self._schedule_cache.get(key)
+            if schedule is not None:
+                self._schedule_cache.move_to_end(key)
+                return schedule
+
+        with self.db.get_readonly_connection() as conn:
+            schedule = self._get_schedule_conn(conn, user_id, name)
+
+        if schedule is not None:
+            with self._cache_lock:
+                self._schedule_cache[key] = schedule
+                if len(self._schedule_cache) > SCHEDULE_CACHE_SIZE:
+                    self._schedule_cache.popitem(last=False)
+        return schedule
+
+    def _invalidate(self, user_id: int, name: str):
+        """Drop a cached schedule after it has been written.
+
+        Args:
+            user_id: Telegram user ID
+            name: Schedule name
+        """
+        with self._cache_lock:
+            self._schedule_cache.pop((user_id, name), None)
+
+    @staticmethod
+    def _get_schedule_conn(conn: sqlite3.Connection, user_id: int, name: str) -> Optional[Schedule]:
+        """Get a schedule by user ID and name on an already-held connection.
+
+        Args:
+            conn: Open database connection
+            user_id: Telegram user ID
+            name: Schedule name
+
+        Returns:
+            Schedule instance or None if not found
+        """
+        row = conn.execute(
+            "SELECT * FROM schedules WHERE user_id = ? AND name = ?",
+            (user_id, name)
+        ).fetchone()
+        return Schedule.from_db_row(row) if row else None
+
+    @staticmethod
+    def _filter_clause(user_id: int, period: Optional[str]) -> Tuple[str, tuple]:
+        """Build the WHERE clause shared by the schedule list queries.
+
+        Args:
+            user_id: Telegram user ID
+            period: Optional period filter
+
+        Returns:
+            Tuple of (where_sql, params)
+        """
+        # For now, implement basic filtering
+        # TODO: Enhance period filtering (today, week, month)
+        if period:
+            # Simple keyword search for now
+            pattern = f"%{period}%"
+            return (
+                "WHERE user_id = ? AND (name LIKE ? OR title LIKE ? OR description LIKE ?)",
+                (user_id, pattern, pattern, pattern)
+            )
+        return "WHERE user_id = ?", (user_id,)
+
+    def list_schedule_ids(self, user_id: int, period: Optional[str] = None) -> List[int]:
+        """List matching schedule IDs for a user, most recently updated first.
+
+        Lets callers page through results while holding only IDs in memory.
+
+        Args:
+            user_id: Telegram user ID
+            period: Optional period filter
+
+        Returns:
+            List of schedule IDs
+        """
+        where, params = self._filter_clause(user_id, period)
+
+        with self.db.get_readonly_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                "SELECT * FROM schedules WHERE user_id = ? AND name = ?",
-                (user_id, name)
+                f"SELECT id FROM schedules {where} ORDER BY updated_at DESC, id DESC",
+                params
             )
-            row = cursor.fetchone()
-            return Schedule.from_db_row(row) if row else None
+            return [row[0] for row in cursor]
+
+    def get_schedules_by_ids(self, user_id: int, ids: List[int]) -> List[Schedule]:
+        """Get schedules by ID, preserving the order of ``ids``.
 
-    def list_schedules(self, user_id: int, period: Optional[str] = None) -> List[Schedule]:
-        """List schedules for a user, optionally filtered by period.
+        IDs that no longer exist (e.g. deleted since they were listed) are skipped.
 
         Args:
             user_id: Telegram user ID
-            period: Optional period filter (e.g., 'today', 'week', 'month')
+            ids: Schedule IDs to fetch
 
         Returns:
             List of Schedule instances
         """
-        with self.db.get_connection() as conn:
-            cursor = conn.cursor()
+        if not ids:
+            return []
 
-            # For now, implement basic filtering
-            # TODO: Enhance period filtering (today, week, month)
-            if period:
-                # Simple keyword search for now
-                cursor.execute(
-                    """
-                    SELECT * FROM schedules
-                    WHERE user_id = ?
-                    AND (name LIKE ? OR title LIKE ? OR description LIKE ?)
-                    ORDER BY start_datetime ASC
-                    """,
-                    (user_id, f"%{period}%", f"%{period}%", f"%{period}%")
-                )
-            else:
-                cursor.execute(
-                    "SELECT * FROM schedules WHERE user_id = ? ORDER BY start_datetime ASC",
-                    (user_id,)
-                )
+        placeholders = ','.join('?' * len(ids))
+        with self.db.get_readonly_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"SELECT * FROM schedules WHERE user_id = ? AND id IN ({placeholders})",
+                (user_id, *ids)
+            )
+            by_id = {row['id']: Schedule.from_db_row(row) for row in cursor}
 
-            rows = cursor.fetchall()
-            return [Schedule.from_db_row(row) for row in rows]
+        return [by_id[i] for i in ids if i in by_id]
 
     def save_schedule(
         self,
@@ -105,40 +207,22 @@ class ScheduleModule:
         end_dt = datetime.fromisoformat(end_datetime.replace(' ', 'T'))
 
         with self.db.get_connection() as conn:
-            cursor = conn.cursor()
-
-            # Check if schedule exists
-            existing = self.get_schedule(user_id, name)
-
-            if existing:
-                # Update existing schedule
-                cursor.execute(
-                    """
-                    UPDATE schedules
-                    SET title = ?, description = ?, start_datetime = ?,
-                        end_datetime = ?, reminder_minutes = ?, updated_at = CURRENT_TIMESTAMP
-                    WHERE user_id = ? AND name = ?
-                    """,
-                    (title, description, start_dt.isoformat(), end_dt.isoformat(),
-                     reminder_minutes, user_id, name)
-                )
-                logger.info(f"Updated schedule '{name}' for user {user_id}")
+            # Insert or update in one statement via the (user_id, name)
+            # UNIQUE constraint, reading the stored row back on the same
+            # connection
+            cursor = conn.execute(
+                UPSERT_SCHEDULE_SQL,
+                (user_id, name, title, description, start_dt.isoformat(),
+                 end_dt.isoformat(), reminder_minutes)
+            )
+            if SUPPORTS_RETURNING:
+                schedule = Schedule.from_db_row(cursor.fetchone())
             else:
-                # Create new schedule
-                cursor.execute(
-                    """
-                    INSERT INTO schedules
-                    (user_id, name, title, description, start_datetime, end_datetime, reminder_minutes)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (user_id, name, title, description, start_dt.isoformat(),
-                     end_dt.isoformat(), reminder_minutes)
-                )
-                logger.info(f"Created schedule '{name}' for user {user_id}")
-
-            conn.commit()
-
-        return self.get_schedule(user_id, name)
+                schedule = self._get_schedule_conn(conn, user_id, name)
+
+        self._invalidate(user_id, name)
+        logger.info(f"Saved schedule '{name}' for user {user_id}")
+        return schedule
 
     def delete_schedule(self, user_id: int, name: str) -> bool:
         """Delete a schedule.
@@ -151,18 +235,27 @@ class ScheduleModule:
             True if deleted, False if not found
         """
         with self.db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "DELETE FROM schedules WHERE user_id = ? AND name = ?",
+            # Take the write lock up front so the lookup and the delete (and
+            # the reminders it cascades to) run as one transaction
+            if not conn.in_transaction:
+                conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT id, reminder_minutes FROM schedules WHERE user_id = ? AND name = ?",
                 (user_id, name)
-            )
-            conn.commit()
-            deleted = cursor.rowcount > 0
+            ).fetchone()
+            if row is None:
+                return False
+
+            conn.execute("DELETE FROM schedules WHERE id = ?", (row['id'],))
 
-            if deleted:
-                logger.info(f"Deleted schedule '{name}' for user {user_id}")
+        self._invalidate(user_id, name)
+        logger.info(f"Deleted schedule '{name}' for user {user_id}")
 
-            return deleted
+        # Drop the in-memory job once the rows are gone
+        if self.reminder_service and row['reminder_minutes']:
+            self.reminder_service.cancel_reminder(row['id'])
+
+        return True
 
     def get_upcoming_schedules(self, user_id: int, limit: int = 10) -> List[Schedule]:
         """Get upcoming schedules for a user.
@@ -174,16 +267,20 @@ class ScheduleModule:
         Returns:
             List of upcoming Schedule instances
         """
-        with self.db.get_connection() as conn:
+        # start_datetime holds local time as isoformat() text, so a bound
+        # value in the same shape compares as a plain string and bounds the
+        # (user_id, start_datetime) index range scan
+        now = datetime.now().isoformat(timespec='seconds')
+
+        with self.db.get_readonly_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 """
                 SELECT * FROM schedules
-                WHERE user_id = ? AND start_datetime >= datetime('now')
+                WHERE user_id = ? AND start_datetime >= ?
                 ORDER BY start_datetime ASC
                 LIMIT ?
                 """,
-                (user_id, limit)
+                (user_id, now, limit)
             )
-            rows = cursor.fetchall()
-            return [Schedule.from_db_row(row) for row in rows]
+            return [Schedule.from_db_row(row) for row in cursor]
@@ -1,15 +1,31 @@
 """Reminder service for scheduling and sending notifications."""
 
 import logging
+import time
 from datetime import datetime, timedelta
-from apscheduler.schedulers.background import BackgroundScheduler
+from typing import List
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.date import DateTrigger
 
 from models.database import Database
 from models.schedule import Schedule
+from utils.datetime_utils import format_datetime
 
 logger = logging.getLogger(__name__)
 
+# Kept as a constant so every poll issues byte-identical SQL and hits the
+# connection's prepared-statement cache instead of being re-parsed.
+# Ordering by r.id keeps the reload deterministic whichever index the
+# planner walks: should a schedule ever have several rows, the newest is
+# added last and wins.
+PENDING_REMINDERS_SQL = """
+    SELECT s.*, r.reminder_time
+    FROM schedules s
+    JOIN reminders r ON s.id = r.schedule_id
+    WHERE r.sent = 0 AND r.reminder_time > ?
+    ORDER BY r.id
+"""
+
 
 class ReminderService:
     """Handle reminder scheduling and notifications."""
@@ -21,20 +37,29 @@ class ReminderService:
             db: Database instance
         """
         self.db = db
-        self.scheduler = BackgroundScheduler()
+        # Jobs run as coroutines on the bot's own event loop, which the
+        # scheduler binds to when it is started
+        self.scheduler = AsyncIOScheduler()
 
     def start(self, application):
         """Start the reminder service.
 
+        Must be called from the running event loop (e.g. post_init).
+
         Args:
             application: Telegram bot application instance
         """
         self.application = application
-        self.scheduler.start()
-        logger.info("Reminder service started")
 
-        # Load and schedule existing reminders
-        self._load_pending_reminders()
+        # Start paused: a running scheduler queues a wakeup callback on the
+        # event loop for every added job, while a paused one just stores
+        # them and resume() processes the whole batch in one pass
+        self.scheduler.start(paused=True)
+        try:
+            self._load_pending_reminders()
+        finally:
+            self.scheduler.resume()
+        logger.info("Reminder service started")
 
     def stop(self):
         """Stop the reminder service."""
@@ -47,78 +72,97 @@ class ReminderService:
         Args:
             schedule: Schedule instance
         """
-        if not schedule.reminder_minutes:
-            logger.info(f"No reminder set for schedule {schedule.name}")
-            return
+        self.schedule_reminders_bulk([schedule])
+
+    def schedule_reminders_bulk(self, schedules: List[Schedule]) -> int:
+        """Schedule reminders for many schedules in one transaction.
+
+        Schedules without a reminder, or whose reminder time has already
+        passed, are skipped.
+
+        Args:
+            schedules: Schedule instances
+
+        Returns:
+            Number of reminders scheduled
+        """
+        now = datetime.now()
+        pending = []
+        for schedule in schedules:
+            if not schedule.reminder_minutes:
+                logger.info(f"No reminder set for schedule {schedule.name}")
+                continue
+
+            # Calculate reminder time
+            reminder_time = schedule.start_datetime - timedelta(minutes=schedule.reminder_minutes)
+
+            # Don't schedule if reminder time is in the past
+            if reminder_time <= now:
+                logger.info(f"Reminder time for schedule {schedule.name} is in the past, skipping")
+                continue
 
-        # Calculate reminder time
-        reminder_time = schedule.start_datetime - timedelta(minutes=schedule.reminder_minutes)
+            pending.append((schedule, reminder_time))
 
-        # Don't schedule if reminder time is in the past
-        if reminder_time <= datetime.now():
-            logger.info(f"Reminder time for schedule {schedule.name} is in the past, skipping")
-            return
+        if not pending:
+            return 0
 
-        # Store reminder in database
+        # Store reminders in database with one prepared statement and commit;
+        # re-saving a schedule moves its existing reminder row to the new time
         with self.db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
+            conn.executemany(
                 """
-                INSERT OR REPLACE INTO reminders (schedule_id, reminder_time, sent)
+                INSERT INTO reminders (schedule_id, reminder_time, sent)
                 VALUES (?, ?, FALSE)
+                ON CONFLICT(schedule_id) DO UPDATE SET
+                    reminder_time = excluded.reminder_time,
+                    sent = FALSE,
+                    sent_at = NULL
                 """,
-                (schedule.id, reminder_time.isoformat())
+                [(schedule.id, int(reminder_time.timestamp())) for schedule, reminder_time in pending]
             )
-            conn.commit()
-
-        # Schedule the job
-        job_id = f"reminder_{schedule.id}"
-        self.scheduler.add_job(
-            self._send_reminder,
-            trigger=DateTrigger(run_date=reminder_time),
-            args=[schedule.user_id, schedule],
-            id=job_id,
-            replace_existing=True
-        )
-
-        logger.info(
-            f"Scheduled reminder for schedule {schedule.name} "
-            f"at {reminder_time.strftime('%Y-%m-%d %H:%M')}"
-        )
-
-    def _send_reminder(self, user_id: int, schedule: Schedule):
-        """Send reminder notification to user (sync wrapper for async work).
 
-        Args:
-            user_id: Telegram user ID
-            schedule: Schedule instance
-        """
-        # Use the application's job queue to run the async task
-        self.application.job_queue.run_once(
-            callback=self._send_reminder_async,
-            when=0,  # Run immediately
-            data={'user_id': user_id, 'schedule': schedule},
-            name=f"send_reminder_{schedule.id}"
-        )
+        # Schedule the jobs; pausing a running scheduler means it wakes up
+        # once on resume rather than once per added job
+        batch = len(pending) > 1 and self.scheduler.running
+        if batch:
+            self.scheduler.pause()
+        try:
+            for schedule, reminder_time in pending:
+                job_id = f"reminder_{schedule.id}"
+                self.scheduler.add_job(
+                    self._send_reminder,
+                    trigger=DateTrigger(run_date=reminder_time),
+                    args=[schedule.user_id, schedule],
+                    id=job_id,
+                    replace_existing=True
+                )
+
+                logger.info(
+                    f"Scheduled reminder for schedule {schedule.name} "
+                    f"at {format_datetime(reminder_time)}"
+                )
+        finally:
+            if batch:
+                self.scheduler.resume()
 
-    async def _send_reminder_async(self, context):
-        """Async task to send reminder notification.
+        return len(pending)
+
+    async def _send_reminder(self, user_id: int, schedule: Schedule):
+        """Send reminder notification to user.
 
         Args:
-            context: Job context containing user_id and schedule
+            user_id: Telegram user ID
+            schedule: Schedule instance
         """
-        user_id = context.job.data['user_id']
-        schedule = context.job.data['schedule']
-
         try:
             message = (
                 f"🔔 Reminder: {schedule.title}\n\n"
-                f"Starts at: {schedule.start_datetime.strftime('%Y-%m-%d %H:%M')}\n"
-                f"Ends at: {schedule.end_datetime.strftime('%Y-%m-%d %H:%M')}\n\n"
+                f"Starts at: {format_datetime(schedule.start_datetime)}\n"
+                f"Ends at: {format_datetime(schedule.end_datetime)}\n\n"
                 f"{schedule.description}"
             )
 
-            await context.bot.send_message(
+            await self.application.bot.send_message(
                 chat_id=user_id,
                 text=message
             )
@@ -143,36 +187,30 @@ class ReminderService:
 
     def _load_pending_reminders(self):
         """Load and schedule all pending reminders from database."""
-        with self.db.get_connection() as conn:
+        with self.db.get_readonly_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(
-                """
-                SELECT s.*, r.reminder_time
-                FROM schedules s
-                JOIN reminders r ON s.id = r.schedule_id
-                WHERE r.sent = FALSE AND r.reminder_time > datetime('now', 'localtime')
-                """
-            )
+            cursor.execute(PENDING_REMINDERS_SQL, (int(time.time()),))
             rows = cursor.fetchall()
 
-            for row in rows:
-                schedule = Schedule.from_db_row(row)
-                reminder_time = datetime.fromisoformat(row['reminder_time'])
-
-                # Schedule the job
-                job_id = f"reminder_{schedule.id}"
-                self.scheduler.add_job(
-                    self._send_reminder,
-                    trigger=DateTrigger(run_date=reminder_time),
-                    args=[schedule.user_id, schedule],
-                    id=job_id,
-                    replace_existing=True
-                )
+        # Return the pooled connection before scheduling the jobs
+        for row in rows:
+            schedule = Schedule.from_db_row(row)
+            reminder_time = datetime.fromtimestamp(row['reminder_time'])
+
+            # Schedule the job
+            job_id = f"reminder_{schedule.id}"
+            self.scheduler.add_job(
+                self._send_reminder,
+                trigger=DateTrigger(run_date=reminder_time),
+                args=[schedule.user_id, schedule],
+                id=job_id,
+                replace_existing=True
+            )
 
-                logger.info(
-                    f"Loaded pending reminder for schedule {schedule.name} "
-                    f"at {reminder_time.strftime('%Y-%m-%d %H:%M')}"
-                )
+            logger.info(
+                f"Loaded pending reminder for schedule {schedule.name} "
+                f"at {format_datetime(reminder_time)}"
+            )
 
     def cancel_reminder(self, schedule_id: int):
         """Cancel a scheduled reminder.
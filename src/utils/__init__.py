@@ -1,13 +1,22 @@
 """Utility functions and helpers."""
 
-from .datetime_utils import parse_datetime, format_datetime, parse_period
-from .markdown_utils import render_markdown, escape_markdown_v2, truncate_text
+from .datetime_utils import parse_datetime, format_datetime, format_time, parse_period
+from .markdown_utils import (
+    render_markdown,
+    render_markdown_preview,
+    escape_html,
+    escape_markdown_v2,
+    truncate_text
+)
 
 __all__ = [
     'parse_datetime',
     'format_datetime',
+    'format_time',
     'parse_period',
     'render_markdown',
+    'render_markdown_preview',
+    'escape_html',
     'escape_markdown_v2',
     'truncate_text'
 ]
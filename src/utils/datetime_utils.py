@@ -1,8 +1,28 @@
 """Datetime utility functions."""
 
-from datetime import datetime
+import re
+from datetime import datetime, timedelta
 from typing import Optional
 
+# Matches the common 'YYYY-MM-DD HH:MM[:SS]' / 'YYYY-MM-DDTHH:MM[:SS]' shapes,
+# so they can be built directly instead of via strptime
+_DATETIME_RE = re.compile(r'(\d{4})-(\d{2})-(\d{2})[ T](\d{2}):(\d{2})(?::(\d{2}))?', re.ASCII)
+
+_DATETIME_FORMATS = (
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d %H:%M',
+    '%Y-%m-%dT%H:%M:%S',
+    '%Y-%m-%dT%H:%M',
+)
+
+# Period name -> (start, end) offsets in days from midnight today
+_PERIODS = {
+    'today': (0, 1),
+    'tomorrow': (1, 2),
+    'week': (0, 7),
+    'month': (0, 30),
+}
+
 
 def parse_datetime(datetime_str: str) -> datetime:
     """Parse datetime string to datetime object.
@@ -21,15 +41,16 @@ def parse_datetime(datetime_str: str) -> datetime:
     Raises:
         ValueError: If datetime string is invalid
     """
-    # Try different formats
-    formats = [
-        '%Y-%m-%d %H:%M:%S',
-        '%Y-%m-%d %H:%M',
-        '%Y-%m-%dT%H:%M:%S',
-        '%Y-%m-%dT%H:%M',
-    ]
-
-    for fmt in formats:
+    match = _DATETIME_RE.fullmatch(datetime_str)
+    if match:
+        year, month, day, hour, minute, second = match.groups()
+        try:
+            return datetime(int(year), int(month), int(day), int(hour), int(minute), int(second or 0))
+        except ValueError:
+            pass  # Out-of-range field; let the loop below report it
+
+    # Fall back to strptime for looser variants (e.g. single-digit fields)
+    for fmt in _DATETIME_FORMATS:
         try:
             return datetime.strptime(datetime_str, fmt)
         except ValueError:
@@ -45,6 +66,9 @@ def parse_datetime(datetime_str: str) -> datetime:
 def format_datetime(dt: datetime, include_seconds: bool = False) -> str:
     """Format datetime object to string.
 
+    Builds the fixed '%Y-%m-%d %H:%M' layout from the datetime's fields,
+    which is several times faster than strftime.
+
     Args:
         dt: datetime object to format
         include_seconds: Whether to include seconds in output
@@ -53,8 +77,20 @@ def format_datetime(dt: datetime, include_seconds: bool = False) -> str:
         Formatted datetime string
     """
     if include_seconds:
-        return dt.strftime('%Y-%m-%d %H:%M:%S')
-    return dt.strftime('%Y-%m-%d %H:%M')
+        return f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d} {dt.hour:02d}:{dt.minute:02d}:{dt.second:02d}"
+    return f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d} {dt.hour:02d}:{dt.minute:02d}"
+
+
+def format_time(dt: datetime) -> str:
+    """Format the time of day of a datetime as 'HH:MM'.
+
+    Args:
+        dt: datetime object to format
+
+    Returns:
+        Formatted time string
+    """
+    return f"{dt.hour:02d}:{dt.minute:02d}"
 
 
 def parse_period(period: str) -> tuple[Optional[datetime], Optional[datetime]]:
@@ -68,19 +104,9 @@ def parse_period(period: str) -> tuple[Optional[datetime], Optional[datetime]]:
     Returns:
         Tuple of (start_datetime, end_datetime)
     """
-    from datetime import timedelta
-
-    now = datetime.now()
-    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
-
-    if period.lower() == 'today':
-        return today, today + timedelta(days=1)
-    elif period.lower() == 'tomorrow':
-        tomorrow = today + timedelta(days=1)
-        return tomorrow, tomorrow + timedelta(days=1)
-    elif period.lower() == 'week':
-        return today, today + timedelta(days=7)
-    elif period.lower() == 'month':
-        return today, today + timedelta(days=30)
-    else:
+    offsets = _PERIODS.get(period.lower())
+    if offsets is None:
         return None, None
+
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    return today + timedelta(days=offsets[0]), today + timedelta(days=offsets[1])
@@ -1,23 +1,96 @@
 """Markdown utility functions."""
 
-import markdown
+import functools
+import logging
+import re
 from typing import Optional
 
+import mistune
+try:
+    import cmarkgfm
+except ImportError:  # optional C renderer, see USE_CMARK
+    cmarkgfm = None
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Shared renderer, built (and its rules compiled) once. Raw HTML in notes
+# is escaped rather than passed through; ~~strikethrough~~ renders to
+# <del>, which Telegram supports. Tables are left out since Telegram
+# can't display them.
+_markdown = mistune.create_markdown(escape=True, plugins=['strikethrough'])
+
+# Opt-in C renderer (libcmark-gfm bindings), falling back to mistune
+_USE_CMARK = Config.USE_CMARK and cmarkgfm is not None
+if Config.USE_CMARK and cmarkgfm is None:
+    logger.warning("USE_CMARK is set but cmarkgfm is not installed; using mistune")
+
+# cmark drops raw HTML in safe mode but leaves this comment in its place,
+# which Telegram's HTML parser does not accept
+_CMARK_RAW_HTML_PLACEHOLDER = '<!-- raw HTML omitted -->'
+
+# Rendered HTML tags Telegram doesn't support well, and their replacements
+_PREVIEW_TAG_MAP = {
+    '<p>': '', '</p>': '\n',
+    '<h1>': '\n<b>', '</h1>': '</b>',
+    '<h2>': '\n<b>', '</h2>': '</b>',
+    '<h3>': '\n<b>', '</h3>': '</b>',
+    '<em>': '<i>', '</em>': '</i>',
+}
+_PREVIEW_TAG_RE = re.compile(r'</?(?:p|h[1-3]|em)>')
+
+# Matches anything the markdown parser would turn into markup or rewrite:
+# inline/block syntax characters, characters it escapes or replaces (NUL,
+# BOM), list/heading/setext markers at line starts, whitespace (including
+# Unicode spaces) at either end of a line, CRs and runs of blank lines.
+# Text without a match renders to plain escaped paragraphs.
+_MD_SYNTAX_RE = re.compile(r'[*_#\[`>!<&\\~|"\r\x00\ufeff]|^[^\S\n]|[^\S\n]$|^[-+=]|^\d+[.)]|\n\n\n', re.MULTILINE)
+
+# Single-pass translation table for escape_html
+_HTML_ESCAPE_TABLE = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;'})
+
+# Single-pass translation table for escape_markdown_v2, prefixing each
+# character MarkdownV2 treats as special with a backslash
+_MDV2_ESCAPE_TABLE = str.maketrans({c: '\\' + c for c in '_*[]()~`>#+-=|{}.!'})
+
+
+def _replace_preview_tag(match: re.Match) -> str:
+    """Map a matched preview tag to its Telegram-friendly replacement."""
+    return _PREVIEW_TAG_MAP[match.group(0)]
+
+
+def _render_plain(text: str) -> str:
+    """Render text free of markdown syntax exactly as the parser would.
+
+    Blank lines separate paragraphs; everything else is escaped as-is.
+    """
+    paragraphs = (paragraph.strip('\n') for paragraph in text.split('\n\n'))
+    return ''.join(f"<p>{escape_html(paragraph)}</p>\n" for paragraph in paragraphs if paragraph)
+
 
 def render_markdown(text: str) -> str:
     """Render markdown text to HTML.
 
+    Text without any markdown syntax skips the parser.
+
     Args:
         text: Markdown text
 
     Returns:
         HTML string
     """
-    return markdown.markdown(text)
+    # Plain text doesn't need the parser
+    if not _MD_SYNTAX_RE.search(text):
+        return _render_plain(text)
+    if _USE_CMARK:
+        html = cmarkgfm.markdown_to_html_with_extensions(text, extensions=['strikethrough'])
+        return html.replace(_CMARK_RAW_HTML_PLACEHOLDER, '')
+    return _markdown(text)
 
 
-def escape_markdown_v2(text: str) -> str:
-    """Escape special characters for Telegram MarkdownV2.
+def escape_html(text: str) -> str:
+    """Escape HTML special characters for Telegram HTML messages.
 
     Args:
         text: Text to escape
@@ -25,13 +98,53 @@ def escape_markdown_v2(text: str) -> str:
     Returns:
         Escaped text
     """
-    # Characters that need to be escaped in MarkdownV2
-    special_chars = ['_', '*', '[', ']', '(', ')', '~', '`', '>', '#', '+', '-', '=', '|', '{', '}', '.', '!']
+    return text.translate(_HTML_ESCAPE_TABLE)
+
 
-    for char in special_chars:
-        text = text.replace(char, f'\\{char}')
+@functools.lru_cache(maxsize=512)
+def render_markdown_preview(content: str, max_length: int = 300) -> str:
+    """Render markdown content as an HTML preview for Telegram.
 
-    return text
+    Rendering is deterministic, so results are cached by content and
+    length; the same note shown in a list, a view and a save
+    confirmation is only parsed once.
+
+    Args:
+        content: Markdown content
+        max_length: Maximum number of content characters to render
+
+    Returns:
+        HTML string using only tags Telegram supports
+    """
+    content_preview = content[:max_length] + '...' if len(content) > max_length else content
+
+    if not content_preview.strip():
+        return ""
+
+    # Plain text renders to itself, so skip the parser entirely
+    if not _MD_SYNTAX_RE.search(content_preview):
+        return escape_html(content_preview).strip()
+
+    try:
+        html_preview = render_markdown(content_preview)
+        # Clean up HTML tags that Telegram doesn't support well
+        html_preview = _PREVIEW_TAG_RE.sub(_replace_preview_tag, html_preview)
+        return html_preview.strip()
+    except Exception as e:
+        logger.warning(f"Failed to render markdown preview: {e}")
+        return escape_html(content_preview)
+
+
+def escape_markdown_v2(text: str) -> str:
+    """Escape special characters for Telegram MarkdownV2.
+
+    Args:
+        text: Text to escape
+
+    Returns:
+        Escaped text
+    """
+    return text.translate(_MDV2_ESCAPE_TABLE)
 
 
 def truncate_text(text: str, max_length: int = 100, suffix: str = '...') -> str:
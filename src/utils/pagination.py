@@ -1,30 +1,84 @@
 """Pagination utilities for listing items."""
 
-from typing import List, Callable, Any, Optional
+import functools
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 from datetime import datetime
 
+# Item button text: "<icon> [<name>] <title>", at most BUTTON_TEXT_MAX chars
+NOTE_BUTTON_PREFIX = "📝 ["
+SCHEDULE_BUTTON_PREFIX = "📅 ["
+BUTTON_TEXT_MAX = 60
+ELLIPSIS = "..."
+
+# Navigation button labels. Button text is sent as-is (Telegram never
+# parses it as MarkdownV2), so these are plain strings, not escaped ones.
+PREV_LABEL = "⬅️ Previous"
+NEXT_LABEL = "Next ➡️"
+
+
+@functools.lru_cache(maxsize=4096)
+def _format_dt(dt: datetime, fmt: str) -> str:
+    """strftime, memoized for items that are rendered repeatedly.
+
+    Only meant for the naive local datetimes stored by the bot: aware
+    datetimes in different zones can compare equal and share an entry.
+    """
+    return dt.strftime(fmt)
+
+
+@functools.lru_cache(maxsize=256)
+def _page_label(page: int, total_pages: int) -> str:
+    """Text of the page indicator button, e.g. '· 2/5 ·'.
+
+    Args:
+        page: Zero-based page number
+        total_pages: Total number of pages
+
+    Returns:
+        Page indicator text
+    """
+    return f"· {page + 1}/{total_pages} ·"
+
 
 class PaginationHelper:
     """Helper class for paginating lists with inline keyboards."""
 
     def __init__(
         self,
-        items: List[Any],
+        item_ids: List[int],
+        page_loader: Callable[[Sequence[int]], List[Any]],
         items_per_page: int = 10,
         callback_prefix: str = "page"
     ):
         """Initialize pagination helper.
 
+        Only the ordered item IDs are kept; each page's items are fetched
+        on demand.
+
         Args:
-            items: List of items to paginate
+            item_ids: Ordered IDs of all items to paginate
+            page_loader: Function that returns the items for a sequence of IDs
             items_per_page: Number of items per page
             callback_prefix: Prefix for callback data
         """
-        self.items = items
+        self.item_ids = item_ids
+        self.page_loader = page_loader
         self.items_per_page = items_per_page
         self.callback_prefix = callback_prefix
-        self.total_pages = max(1, (len(items) + items_per_page - 1) // items_per_page)
+        self.total_pages = max(1, (len(item_ids) + items_per_page - 1) // items_per_page)
+        # Each page's IDs, sliced once up front
+        self._pages: List[Tuple[int, ...]] = [
+            tuple(item_ids[i:i + items_per_page])
+            for i in range(0, len(item_ids), items_per_page)
+        ]
+        # (page, item_callback_prefix) -> keyboard; at most total_pages
+        # entries per prefix since the ID list is fixed for this helper
+        self._keyboard_cache: Dict[Tuple[int, str], InlineKeyboardMarkup] = {}
+
+    def clear_cache(self):
+        """Forget built keyboards so pages are reloaded after items change."""
+        self._keyboard_cache.clear()
 
     def get_page(self, page: int = 0) -> List[Any]:
         """Get items for a specific page.
@@ -33,11 +87,10 @@ class PaginationHelper:
             page: Page number (0-indexed)
 
         Returns:
-            List of items for the page
+            List of items for the page (empty if the page is out of range)
         """
-        start = page * self.items_per_page
-        end = start + self.items_per_page
-        return self.items[start:end]
+        page_ids = self._pages[page] if 0 <= page < len(self._pages) else ()
+        return self.page_loader(page_ids)
 
     def get_keyboard(
         self,
@@ -47,6 +100,9 @@ class PaginationHelper:
     ) -> InlineKeyboardMarkup:
         """Generate inline keyboard for a page.
 
+        Keyboards are cached per page and item prefix, so paging back to
+        a page already shown doesn't reload or rebuild it.
+
         Args:
             page: Current page number (0-indexed)
             item_callback_prefix: Prefix for item callback data
@@ -55,42 +111,45 @@ class PaginationHelper:
         Returns:
             InlineKeyboardMarkup with items and navigation
         """
-        keyboard = []
+        cache_key = (page, item_callback_prefix)
+        cached = self._keyboard_cache.get(cache_key)
+        if cached is not None:
+            return cached
 
         # Add item buttons (one per row)
-        page_items = self.get_page(page)
-        for item in page_items:
-            button_text, callback_data = item_formatter(item)
-            keyboard.append([InlineKeyboardButton(
-                text=button_text,
-                callback_data=f"{item_callback_prefix}:{callback_data}"
-            )])
+        prefix = f"{item_callback_prefix}:"
+        keyboard = [
+            [InlineKeyboardButton(text=button_text, callback_data=prefix + callback_data)]
+            for button_text, callback_data in map(item_formatter, self.get_page(page))
+        ]
 
         # Add navigation buttons
         nav_buttons = []
         if page > 0:
             nav_buttons.append(InlineKeyboardButton(
-                text="⬅️ Previous",
+                text=PREV_LABEL,
                 callback_data=f"{self.callback_prefix}:{page - 1}"
             ))
 
         # Add page indicator
         if self.total_pages > 1:
             nav_buttons.append(InlineKeyboardButton(
-                text=f"· {page + 1}/{self.total_pages} ·",
+                text=_page_label(page, self.total_pages),
                 callback_data="noop"
             ))
 
         if page < self.total_pages - 1:
             nav_buttons.append(InlineKeyboardButton(
-                text="Next ➡️",
+                text=NEXT_LABEL,
                 callback_data=f"{self.callback_prefix}:{page + 1}"
             ))
 
         if nav_buttons:
             keyboard.append(nav_buttons)
 
-        return InlineKeyboardMarkup(keyboard)
+        markup = InlineKeyboardMarkup(keyboard)
+        self._keyboard_cache[cache_key] = markup
+        return markup
 
 
 def format_note_for_list(note) -> str:
@@ -104,14 +163,18 @@ def format_note_for_list(note) -> str:
     """
     # Format date
     if note.updated_at:
-        date_str = note.updated_at.strftime('%b %d, %H:%M')
+        date_str = _format_dt(note.updated_at, '%b %d, %H:%M')
     else:
         date_str = "Unknown"
 
     # Truncate content preview
-    content_preview = note.content[:50].replace('\n', ' ') if note.content else "No content"
-    if len(note.content) > 50:
-        content_preview += "..."
+    content = note.content or ""
+    if len(content) > 50:
+        content_preview = content[:50].replace('\n', ' ') + "..."
+    elif content:
+        content_preview = content.replace('\n', ' ')
+    else:
+        content_preview = "No content"
 
     # Tags
     tags_str = f"🏷 {', '.join(note.tags)}" if note.tags else ""
@@ -129,8 +192,8 @@ def format_schedule_for_list(schedule) -> str:
         Formatted string
     """
     # Format dates
-    start_str = schedule.start_datetime.strftime('%b %d, %H:%M')
-    end_str = schedule.end_datetime.strftime('%H:%M')
+    start_str = _format_dt(schedule.start_datetime, '%b %d, %H:%M')
+    end_str = _format_dt(schedule.end_datetime, '%H:%M')
 
     # Reminder indicator
     reminder_str = ""
@@ -138,13 +201,27 @@ def format_schedule_for_list(schedule) -> str:
         reminder_str = f" 🔔 {schedule.reminder_minutes}m"
 
     # Description preview
-    desc_preview = schedule.description[:50].replace('\n', ' ') if schedule.description else ""
-    if len(schedule.description) > 50:
-        desc_preview += "..."
+    description = schedule.description or ""
+    if len(description) > 50:
+        desc_preview = description[:50].replace('\n', ' ') + "..."
+    else:
+        desc_preview = description.replace('\n', ' ')
 
     return f"📅 *{schedule.title}*\n{desc_preview}\n🕐 {start_str} - {end_str}{reminder_str}"
 
 
+def _button_text(prefix: str, name: str, title: str, suffix: str = '') -> str:
+    """Build "<prefix><name>] <title><suffix>", shortening the title to fit.
+
+    The name (and suffix) are always shown in full; only the title is
+    truncated with an ellipsis when the text would exceed BUTTON_TEXT_MAX.
+    """
+    fixed_len = len(prefix) + len(name) + 2 + len(suffix)
+    if fixed_len + len(title) > BUTTON_TEXT_MAX:
+        title = title[:BUTTON_TEXT_MAX - fixed_len - len(ELLIPSIS)] + ELLIPSIS
+    return ''.join((prefix, name, '] ', title, suffix))
+
+
 def format_note_button(note) -> tuple[str, str]:
     """Format note for inline keyboard button.
 
@@ -155,17 +232,7 @@ def format_note_button(note) -> tuple[str, str]:
         Tuple of (button_text, callback_data)
     """
     # Button text with ID/name shown first
-    button_text = f"📝 [{note.name}] {note.title}"
-    if len(button_text) > 60:
-        # Prioritize showing the name/ID
-        max_title_len = 60 - len(f"📝 [{note.name}] ") - 3
-        truncated_title = note.title[:max_title_len] + "..." if len(note.title) > max_title_len else note.title
-        button_text = f"📝 [{note.name}] {truncated_title}"
-
-    # Callback data
-    callback_data = note.name
-
-    return button_text, callback_data
+    return _button_text(NOTE_BUTTON_PREFIX, note.name, note.title), note.name
 
 
 def format_schedule_button(schedule) -> tuple[str, str]:
@@ -178,15 +245,6 @@ def format_schedule_button(schedule) -> tuple[str, str]:
         Tuple of (button_text, callback_data)
     """
     # Button text with ID/name shown first, then date
-    start_str = schedule.start_datetime.strftime('%m/%d %H:%M')
-    button_text = f"📅 [{schedule.name}] {schedule.title} - {start_str}"
-    if len(button_text) > 60:
-        # Prioritize showing the name/ID
-        max_title_len = 60 - len(f"📅 [{schedule.name}] ") - len(f" - {start_str}") - 3
-        truncated_title = schedule.title[:max_title_len] + "..." if len(schedule.title) > max_title_len else schedule.title
-        button_text = f"📅 [{schedule.name}] {truncated_title} - {start_str}"
-
-    # Callback data
-    callback_data = schedule.name
-
-    return button_text, callback_data
+    start_str = _format_dt(schedule.start_datetime, '%m/%d %H:%M')
+    button_text = _button_text(SCHEDULE_BUTTON_PREFIX, schedule.name, schedule.title, ' - ' + start_str)
+    return button_text, schedule.name
@@ -1,35 +1,82 @@
 """Simple web server for Telegram Web App."""
 
+import hashlib
+import heapq
+import io
 import os
 import logging
+import re
 import secrets
 import time
-from http.server import HTTPServer, SimpleHTTPRequestHandler
-from threading import Thread, Lock
-from urllib.parse import urlparse, parse_qs
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from threading import Event, Thread, Lock
+from typing import Dict, Optional, Tuple
+from urllib.parse import unquote, urlsplit
 
 logger = logging.getLogger(__name__)
 
+# Editor pages that may only be opened with a valid one-time token
+PROTECTED_PAGES = ('note_editor.html', 'schedule_editor.html')
+
+# First _token parameter in a query string
+TOKEN_PARAM_RE = re.compile(r'(?:^|&)_token=([^&]*)')
+
+# Body of the 403 page for protected editors opened without a valid
+# token, encoded once at import
+DENIED_HTML = """\
+<!DOCTYPE html>
+<html>
+<head>
+    <title>Access Denied</title>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+</head>
+<body style="font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; text-align: center; padding: 50px; max-width: 500px; margin: 0 auto;">
+    <h1 style="color: #e74c3c;">🔒 Access Denied</h1>
+    <p style="font-size: 18px; margin: 20px 0;">This page can only be accessed through the Telegram Bot.</p>
+    <p style="color: #7f8c8d;">Please use the appropriate command in your Telegram bot to access this editor.</p>
+    <hr style="margin: 30px 0; border: none; border-top: 1px solid #eee;">
+    <p style="font-size: 14px; color: #95a5a6;">If you believe this is an error, please try again from the bot.</p>
+</body>
+</html>
+""".encode('utf-8')
+DENIED_CONTENT_LENGTH = str(len(DENIED_HTML))
+
 
 class TokenManager:
-    """Manage one-time access tokens for Web App security."""
+    """Manage one-time access tokens for Web App security.
+
+    Validation takes no lock: consuming a token is a single atomic
+    dict.pop(). Tokens that are never used are purged periodically by a
+    background thread.
+    """
 
-    def __init__(self, expiry_seconds=300):
+    def __init__(self, expiry_seconds=300, cleanup_interval=60):
         """Initialize token manager.
 
         Args:
             expiry_seconds: How long tokens are valid (default: 5 minutes)
+            cleanup_interval: Seconds between purges of expired tokens
         """
-        self.tokens = {}  # {token: (timestamp, used)}
-        self.lock = Lock()
+        self.tokens = {}  # {token: expiry_time}
+        # Min-heap of (expiry_time, token), so cleanup only touches
+        # tokens that have actually expired
+        self._expiry_heap = []
+        self.lock = Lock()  # guards _expiry_heap only
         self.expiry_seconds = expiry_seconds
+        self.cleanup_interval = cleanup_interval
+
+        self._stop_cleanup = Event()
+        self._cleanup_thread = Thread(target=self._cleanup_loop, daemon=True)
+        self._cleanup_thread.start()
 
     def generate_token(self) -> str:
         """Generate a new secure token."""
         token = secrets.token_urlsafe(32)
+        expiry = time.time() + self.expiry_seconds
+        self.tokens[token] = expiry
         with self.lock:
-            self.tokens[token] = (time.time(), False)
-            self._cleanup_expired()
+            heapq.heappush(self._expiry_heap, (expiry, token))
         return token
 
     def validate_and_consume(self, token: str) -> bool:
@@ -44,36 +91,28 @@ class TokenManager:
         if not token:
             return False
 
-        with self.lock:
-            self._cleanup_expired()
-
-            if token not in self.tokens:
-                return False
-
-            timestamp, used = self.tokens[token]
-
-            # Check if token is expired
-            if time.time() - timestamp > self.expiry_seconds:
-                del self.tokens[token]
-                return False
+        # Removing the token is what consumes it, so a second request
+        # with the same token finds nothing
+        expiry = self.tokens.pop(token, None)
+        return expiry is not None and expiry >= time.time()
 
-            # Check if already used
-            if used:
-                return False
+    def close(self):
+        """Stop the background cleanup thread."""
+        self._stop_cleanup.set()
 
-            # Mark as used
-            self.tokens[token] = (timestamp, True)
-            return True
+    def _cleanup_loop(self):
+        """Purge expired tokens every cleanup_interval seconds until closed."""
+        while not self._stop_cleanup.wait(self.cleanup_interval):
+            self._cleanup_expired()
 
     def _cleanup_expired(self):
         """Remove expired tokens."""
         current_time = time.time()
-        expired = [
-            token for token, (timestamp, _) in self.tokens.items()
-            if current_time - timestamp > self.expiry_seconds
-        ]
-        for token in expired:
-            del self.tokens[token]
+        with self.lock:
+            heap = self._expiry_heap
+            while heap and heap[0][0] < current_time:
+                _, token = heapq.heappop(heap)
+                self.tokens.pop(token, None)
 
 
 class WebAppHandler(SimpleHTTPRequestHandler):
@@ -81,62 +120,102 @@ class WebAppHandler(SimpleHTTPRequestHandler):
 
     token_manager = None  # Will be set by WebAppServer
 
+    # {file path: (mtime, etag)}, shared by all handler instances; an
+    # entry is recomputed when the file's mtime changes
+    _etag_cache: Dict[str, Tuple[float, str]] = {}
+
     def __init__(self, *args, **kwargs):
+        self._etag = None
         # Set the directory to serve files from
         super().__init__(*args, directory='webapp', **kwargs)
 
+    @classmethod
+    def _get_etag(cls, path: str) -> Optional[str]:
+        """Get the content-based ETag for a file, or None if it isn't one.
+
+        Args:
+            path: Filesystem path of the requested resource
+
+        Returns:
+            Quoted ETag value, or None for directories and missing files
+        """
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        if not os.path.isfile(path):
+            return None
+
+        cached = cls._etag_cache.get(path)
+        if cached is not None and cached[0] == st.st_mtime:
+            return cached[1]
+
+        with open(path, 'rb') as f:
+            etag = '"' + hashlib.blake2b(f.read(), digest_size=16).hexdigest() + '"'
+        cls._etag_cache[path] = (st.st_mtime, etag)
+        return etag
+
+    def send_head(self):
+        """Send response headers and return the body for GET and HEAD.
+
+        Protected editor pages need a valid one-time token and get the
+        403 page otherwise. Static files answer 304 Not Modified when
+        If-None-Match has their current ETag.
+        """
+        self._etag = None
+        # Decide protection from the file that would actually be served,
+        # so fragments, percent-encoding or dot segments can't sneak an
+        # editor page past the check
+        file_path = self.translate_path(self.path)
+
+        if os.path.basename(file_path) in PROTECTED_PAGES:
+            match = TOKEN_PARAM_RE.search(urlsplit(self.path).query)
+            token = unquote(match.group(1)) if match else None
+
+            if not self.token_manager or not self.token_manager.validate_and_consume(token):
+                logger.warning(f"Unauthorized access attempt to {self.path} (invalid token)")
+                self.send_response(403)
+                self.send_header('Content-type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', DENIED_CONTENT_LENGTH)
+                self.end_headers()
+                return io.BytesIO(DENIED_HTML)
+
+        self._etag = self._get_etag(file_path)
+        if self._etag is not None:
+            if_none_match = self.headers.get('If-None-Match')
+            if if_none_match:
+                candidates = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+                if self._etag in candidates or '*' in candidates:
+                    self.send_response(304)
+                    self.end_headers()
+                    return None
+        return super().send_head()
+
     def log_message(self, format, *args):
         """Override to use our logger instead of stderr."""
         logger.info(f"WebApp: {format % args}")
 
+    def copyfile(self, source, outputfile):
+        """Copy a response body to the client.
+
+        socket.sendfile() hands regular files to sendfile(2), so the
+        kernel copies them straight to the socket; it falls back to plain
+        send() for in-memory bodies and where sendfile isn't available.
+        """
+        if outputfile is self.wfile:
+            self.connection.sendfile(source)
+        else:
+            super().copyfile(source, outputfile)
+
     def end_headers(self):
-        """Add CORS headers for Telegram Web App."""
+        """Add CORS (and, for static files, ETag) headers for Telegram Web App."""
+        if self._etag is not None:
+            self.send_header('ETag', self._etag)
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
         super().end_headers()
 
-    def do_GET(self):
-        """Handle GET requests with token validation."""
-        # Parse URL and query parameters
-        parsed = urlparse(self.path)
-        query_params = parse_qs(parsed.query)
-
-        # Check if this is a protected Web App page
-        if parsed.path.endswith(('note_editor.html', 'schedule_editor.html')):
-            # Extract token from query parameters
-            token_list = query_params.get('_token', [])
-            token = token_list[0] if token_list else None
-
-            # Validate token
-            if not self.token_manager or not self.token_manager.validate_and_consume(token):
-                logger.warning(f"Unauthorized access attempt to {parsed.path} (invalid token)")
-                self.send_response(403)
-                self.send_header('Content-type', 'text/html; charset=utf-8')
-                self.end_headers()
-                html_response = """
-                    <!DOCTYPE html>
-                    <html>
-                    <head>
-                        <title>Access Denied</title>
-                        <meta charset="UTF-8">
-                        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-                    </head>
-                    <body style="font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; text-align: center; padding: 50px; max-width: 500px; margin: 0 auto;">
-                        <h1 style="color: #e74c3c;">🔒 Access Denied</h1>
-                        <p style="font-size: 18px; margin: 20px 0;">This page can only be accessed through the Telegram Bot.</p>
-                        <p style="color: #7f8c8d;">Please use the appropriate command in your Telegram bot to access this editor.</p>
-                        <hr style="margin: 30px 0; border: none; border-top: 1px solid #eee;">
-                        <p style="font-size: 14px; color: #95a5a6;">If you believe this is an error, please try again from the bot.</p>
-                    </body>
-                    </html>
-                """
-                self.wfile.write(html_response.encode('utf-8'))
-                return
-
-        # If validation passed or not a protected page, serve normally
-        super().do_GET()
-
 
 class WebAppServer:
     """Web server for hosting Telegram Web App files."""
@@ -168,7 +247,9 @@ class WebAppServer:
             # Set token manager on handler class
             WebAppHandler.token_manager = self.token_manager
 
-            self.server = HTTPServer((self.host, self.port), WebAppHandler)
+            # One thread per request, so a slow client can't stall the
+            # other editor assets (or other users)
+            self.server = ThreadingHTTPServer((self.host, self.port), WebAppHandler)
             self.thread = Thread(target=self.server.serve_forever, daemon=True)
             self.thread.start()
             logger.info(f"WebApp server started on http://{self.host}:{self.port}")
@@ -181,6 +262,7 @@ class WebAppServer:
         if self.server:
             self.server.shutdown()
             logger.info("WebApp server stopped")
+        self.token_manager.close()
 
     def get_url(self, path='', base_url=None):
         """Get the full URL for a path.
@@ -0,0 +1,92 @@
+"""Tests for the SQLite database manager."""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from models.database import Database  # noqa: E402
+
+
+class DatabaseCloseTest(unittest.TestCase):
+    """Closing the database leaves a complete main file on disk."""
+
+    def test_main_file_has_schema_without_wal(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, 'test.db')
+            Database(db_path).close()
+
+            # Copy only the main file, leaving any -wal/-shm behind
+            copy_path = os.path.join(tmp, 'copy.db')
+            with open(db_path, 'rb') as src, open(copy_path, 'wb') as dst:
+                dst.write(src.read())
+
+            conn = sqlite3.connect(copy_path)
+            try:
+                tables = {row[0] for row in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table'"
+                )}
+            finally:
+                conn.close()
+
+        self.assertTrue({'notes', 'schedules', 'reminders', 'notes_fts'} <= tables)
+
+
+class ReminderMigrationTest(unittest.TestCase):
+    """Legacy reminders tables are rebuilt with one row per schedule."""
+
+    def test_duplicate_reminders_keep_newest_row(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, 'test.db')
+            conn = sqlite3.connect(db_path)
+            conn.executescript("""
+                CREATE TABLE schedules (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id INTEGER NOT NULL,
+                    name TEXT NOT NULL,
+                    title TEXT NOT NULL,
+                    description TEXT,
+                    start_datetime TIMESTAMP NOT NULL,
+                    end_datetime TIMESTAMP NOT NULL,
+                    reminder_minutes INTEGER,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE(user_id, name)
+                );
+                INSERT INTO schedules (user_id, name, title, start_datetime, end_datetime)
+                VALUES (1, 's', 'S', '2030-01-01T10:00:00', '2030-01-01T11:00:00');
+                CREATE TABLE reminders (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    schedule_id INTEGER NOT NULL,
+                    reminder_time TIMESTAMP NOT NULL,
+                    sent BOOLEAN DEFAULT FALSE,
+                    sent_at TIMESTAMP
+                );
+                INSERT INTO reminders (schedule_id, reminder_time)
+                VALUES (1, '2030-01-01T09:50:00'), (1, '2030-01-01T08:00:00');
+            """)
+            conn.close()
+
+            db = Database(db_path)
+            try:
+                with db.get_readonly_connection() as conn:
+                    rows = conn.execute(
+                        "SELECT id, typeof(reminder_time) AS type FROM reminders"
+                    ).fetchall()
+                with self.assertRaises(sqlite3.IntegrityError):
+                    with db.get_connection() as conn:
+                        conn.execute(
+                            "INSERT INTO reminders (schedule_id, reminder_time) VALUES (1, 0)"
+                        )
+            finally:
+                db.close()
+
+        self.assertEqual([(row['id'], row['type']) for row in rows], [(2, 'integer')])
+
+
+if __name__ == '__main__':
+    unittest.main()
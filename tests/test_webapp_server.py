@@ -0,0 +1,65 @@
+"""Tests for the Web App server's editor token check."""
+
+import os
+import sys
+import unittest
+from http.client import HTTPConnection
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from webapp_server import WebAppServer  # noqa: E402
+
+
+class EditorTokenTest(unittest.TestCase):
+    """Protected editor pages are only served with a valid one-time token."""
+
+    @classmethod
+    def setUpClass(cls):
+        # The handler serves the webapp/ directory relative to the cwd
+        cls._old_cwd = os.getcwd()
+        os.chdir(ROOT)
+        cls.server = WebAppServer(host='127.0.0.1', port=0)
+        cls.server.start()
+        cls.port = cls.server.server.server_address[1]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+        cls.server.server.server_close()
+        os.chdir(cls._old_cwd)
+
+    def request(self, path, method='GET'):
+        conn = HTTPConnection('127.0.0.1', self.port, timeout=5)
+        try:
+            conn.request(method, path)
+            response = conn.getresponse()
+            response.read()
+            return response.status
+        finally:
+            conn.close()
+
+    def test_valid_token_is_served_once(self):
+        token = self.server.generate_token()
+        self.assertEqual(self.request(f'/note_editor.html?_token={token}'), 200)
+        self.assertEqual(self.request(f'/note_editor.html?_token={token}'), 403)
+
+    def test_missing_token_is_denied(self):
+        self.assertEqual(self.request('/note_editor.html'), 403)
+        self.assertEqual(self.request('/schedule_editor.html', method='HEAD'), 403)
+
+    def test_percent_encoded_name_is_denied(self):
+        self.assertEqual(self.request('/note%5Feditor.html'), 403)
+
+    def test_fragment_is_denied(self):
+        self.assertEqual(self.request('/note_editor.html#x'), 403)
+
+    def test_trailing_dot_segment_is_denied(self):
+        self.assertEqual(self.request('/note_editor.html/.'), 403)
+
+    def test_unprotected_page_is_served(self):
+        self.assertEqual(self.request('/'), 200)
+
+
+if __name__ == '__main__':
+    unittest.main()